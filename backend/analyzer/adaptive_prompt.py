@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Dict, List
 
+try:
+    import ahocorasick  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ahocorasick = None  # type: ignore
+
 MAX_CHARS_PER_CHUNK = 6000
 
 DOCUMENT_KEYWORDS = {
@@ -11,70 +17,81 @@ DOCUMENT_KEYWORDS = {
 }
 
 
-def detect_document_type(text: str) -> str:
-    lowered = text.lower()
-    for doc_type, keywords in DOCUMENT_KEYWORDS.items():
-        for kw in keywords:
-            if kw.lower() in lowered:
-                return doc_type
-    return "通用"
+# Keywords are CJK, so they are matched against the raw text without case folding.
+_DOC_TYPE_ORDER = list(DOCUMENT_KEYWORDS)
 
 
-def generate_dynamic_examples(text: str) -> str:
-    doc_type = detect_document_type(text)
-    examples_map = {
-        "IT系统": """
+def _build_keyword_automaton() -> Any:
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for priority, doc_type in enumerate(_DOC_TYPE_ORDER):
+        for kw in DOCUMENT_KEYWORDS[doc_type]:
+            # keep the highest-priority doc type when keywords overlap
+            if kw not in automaton:
+                automaton.add_word(kw, priority)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def detect_document_type(text: str) -> str:
+    """Return the first matching document type in ``DOCUMENT_KEYWORDS`` order."""
+
+    if _KEYWORD_AUTOMATON is None:
+        for doc_type, keywords in DOCUMENT_KEYWORDS.items():
+            for kw in keywords:
+                if kw in text:
+                    return doc_type
+        return "通用"
+
+    best = len(_DOC_TYPE_ORDER)
+    for _, priority in _KEYWORD_AUTOMATON.iter(text):
+        if priority < best:
+            best = priority
+            if best == 0:
+                break
+    return _DOC_TYPE_ORDER[best] if best < len(_DOC_TYPE_ORDER) else "通用"
+
+
+_EXAMPLES_MAP: Dict[str, str] = {
+    "IT系统": """
 ### 示例：IT系统招标常见的隐性要求
 - 看似简单的"7×24小时服务"可能意味着需要建立完整的运维团队
 - "与现有系统无缝对接"可能隐含大量的接口开发工作
 - "数据迁移"看似一句话，但可能涉及海量数据清洗
 - 特别注意信创要求、等保要求等合规性要求
 """,
-        "工程建设": """
+    "工程建设": """
 ### 示例：工程类招标的特殊关注点
 - 施工资质的细分等级
 - 安全生产许可证的有效性
 - 项目经理的在建工程限制
 - 材料品牌的指定可能存在垄断
 """,
-        "服务采购": """
+    "服务采购": """
 ### 示例：服务类采购的易忽视点
 - 服务人员的社保要求
 - 服务场地的提供方
 - 知识产权归属
 - 服务成果的验收标准
 """,
-    }
-    return examples_map.get(doc_type, "")
+}
 
 
-def _chunk_text(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> List[Dict[str, Any]]:
-    chunks: List[Dict[str, Any]] = []
-    total = len(text)
-    cursor = 0
-    index = 1
-    while cursor < total:
-        end = min(total, cursor + max_chars)
-        if end < total:
-            # try to break on newline to keep语义完整
-            newline = text.rfind("\n", cursor, end)
-            if newline > cursor + max_chars // 2:
-                end = newline
-        segment = text[cursor:end]
-        chunks.append({"index": index, "start": cursor, "end": end, "content": segment})
-        cursor = end
-        index += 1
-    return chunks
+def generate_dynamic_examples(text: str) -> str:
+    return _EXAMPLES_MAP.get(detect_document_type(text), "")
 
 
-def build_adaptive_prompt(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> Dict[str, Any]:
-    system_prompt = (
-        "你是一位经验丰富的招标文件分析专家。\n"
-        "你的任务是全面识别招标文件中所有可能影响投标成功的关键信息。\n"
-        "请保持开放和批判性思维，不要被任何预设框架限制，重要的是发现文件中的所有关键点。"
-    )
+_SYSTEM_PROMPT = (
+    "你是一位经验丰富的招标文件分析专家。\n"
+    "你的任务是全面识别招标文件中所有可能影响投标成功的关键信息。\n"
+    "请保持开放和批判性思维，不要被任何预设框架限制，重要的是发现文件中的所有关键点。"
+)
 
-    open_analysis_instruction = """
+_OPEN_INSTR = """
 ## 核心任务
 请全面分析这份招标文件，识别所有可能影响投标的重要信息。
 
@@ -141,7 +158,7 @@ def build_adaptive_prompt(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> Di
 5. 从竞争角度，哪些要求可能是为特定供应商定制的？
 """
 
-    two_stage_prompt = """
+_TWO_STAGE = """
 ## 分析策略
 
 ### 第一遍：发散性扫描
@@ -157,18 +174,7 @@ def build_adaptive_prompt(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> Di
 这样可以确保不会因为框架限制而遗漏重要信息。
 """
 
-    dynamic_examples = generate_dynamic_examples(text)
-
-    chunk_messages: List[Dict[str, str]] = []
-    for chunk in _chunk_text(text, max_chars=max_chars):
-        content = (
-            f"### 文档片段 {chunk['index']}（字符 {chunk['start']} - {chunk['end']}）\n"
-            f"请阅读并记住该片段内容，后续回答需要引用对应的字符位置。\n"
-            f"{chunk['content']}"
-        )
-        chunk_messages.append({"role": "user", "content": content})
-
-    schema_instruction = """
+_OUTPUT_SCHEMA = """
 ## 输出结构要求
 请输出能被严格解析的 JSON（不得包含注释、Markdown、额外说明），结构如下：
 {
@@ -236,27 +242,67 @@ def build_adaptive_prompt(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> Di
 - 输出仅包含 JSON 字面量，不得加入 Markdown、注释或额外文字。
 """
 
-    final_instruction = """
+_FINAL_INSTR = """
 基于全部片段，完成结构化输出，特别注意显性废标项、硬性要求以及影响评标和交付的关键信息。若发现相互矛盾、待澄清、潜在风险的条款，请在相应 tab 的 items 中给出明确提示并提供行动建议。
-"""
+""".strip()
+
+
+def _chunk_text(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> List[Dict[str, Any]]:
+    chunks: List[Dict[str, Any]] = []
+    total = len(text)
+    cursor = 0
+    index = 1
+    while cursor < total:
+        end = min(total, cursor + max_chars)
+        if end < total:
+            # try to break on newline to keep语义完整
+            newline = text.rfind("\n", cursor, end)
+            if newline > cursor + max_chars // 2:
+                end = newline
+        segment = text[cursor:end]
+        chunks.append({"index": index, "start": cursor, "end": end, "content": segment})
+        cursor = end
+        index += 1
+    return chunks
 
-    prelude_message = {
-        "role": "user",
-        "content": f"""
-{open_analysis_instruction}
 
-{two_stage_prompt}
+@lru_cache(maxsize=8)
+def _build_prelude(dynamic_examples: str) -> str:
+    # Only the examples vary (one per document type), so the assembled prelude is cached.
+    # They go after the schema so the instructions + schema form a byte-identical prefix
+    # across documents, which providers can serve from their prompt cache.
+    return "".join(
+        [
+            "\n",
+            _OPEN_INSTR,
+            "\n\n",
+            _TWO_STAGE,
+            "\n\n请通读全部片段，严格按照下述 JSON 结构返回结果。不要提前输出。\n\n",
+            _OUTPUT_SCHEMA,
+            "\n\n",
+            dynamic_examples,
+            "\n",
+        ]
+    ).strip()
 
-{dynamic_examples}
 
-请通读全部片段，严格按照下述 JSON 结构返回结果。不要提前输出。\n\n{schema_instruction}
-""".strip(),
-    }
+def build_adaptive_prompt(text: str, max_chars: int = MAX_CHARS_PER_CHUNK) -> Dict[str, Any]:
+    dynamic_examples = generate_dynamic_examples(text)
+
+    chunk_messages: List[Dict[str, str]] = []
+    for chunk in _chunk_text(text, max_chars=max_chars):
+        content = (
+            f"### 文档片段 {chunk['index']}（字符 {chunk['start']} - {chunk['end']}）\n"
+            f"请阅读并记住该片段内容，后续回答需要引用对应的字符位置。\n"
+            f"{chunk['content']}"
+        )
+        chunk_messages.append({"role": "user", "content": content})
 
-    analysis_request = {"role": "user", "content": final_instruction.strip()}
+    prelude_message = {"role": "user", "content": _build_prelude(dynamic_examples)}
+    analysis_request = {"role": "user", "content": _FINAL_INSTR}
 
     messages = [prelude_message]
     messages.extend(chunk_messages)
     messages.append(analysis_request)
 
-    return {"system": system_prompt, "messages": messages, "raw_text": text}
+    return {"system": _SYSTEM_PROMPT, "messages": messages, "raw_text": text}
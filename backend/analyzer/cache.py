@@ -0,0 +1,230 @@
+"""Response caches used to skip repeated LLM round-trips."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional
+
+try:
+    import blake3  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    blake3 = None  # type: ignore
+
+try:
+    import diskcache  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    diskcache = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    SentenceTransformer = None  # type: ignore
+
+# tender text is Chinese, so the default embedder must be multilingual
+DEFAULT_CACHE_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class ExactCache:
+    """Bounded LRU keyed by a BLAKE3 (or, without ``blake3``, BLAKE2b) digest of the request parts.
+
+    With ``directory`` set and ``diskcache`` installed, entries are also written
+    to disk so responses survive restarts and are shared between worker processes;
+    ``ttl`` (seconds) expires those disk entries.
+    Values are copied on ``put`` and ``get`` so callers can mutate what they hold.
+    """
+
+    def __init__(self, max_entries: int = 512, directory: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Any = None
+        if directory and diskcache is not None:
+            self._disk = diskcache.Cache(directory)
+
+    @staticmethod
+    def make_key(parts: Iterable[str]) -> bytes:
+        # BLAKE3 hashes long inputs (whole tenders) with SIMD and several threads
+        digest = blake3.blake3(max_threads=blake3.blake3.AUTO) if blake3 is not None else hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.digest(16) if blake3 is not None else digest.digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(value)
+        if self._disk is None:
+            return None
+        value = self._disk.get(key)
+        if value is None:
+            return None
+        self._remember(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key: bytes, value: Any) -> None:
+        self._remember(key, copy.deepcopy(value))
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self.ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def _remember(self, key: bytes, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:  # pragma: no cover - convenience
+        with self._lock:
+            return len(self._entries)
+
+
+class SemanticCache:
+    """Embedding-keyed cache returning stored responses for near-duplicate queries.
+
+    Entries are scoped by ``namespace`` (e.g. task + rule id) so that a similar
+    query for a different rule never reuses another rule's answer. With ``path``
+    set, entries are also kept in a SQLite file and reloaded on start.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CACHE_MODEL,
+        threshold: float = 0.87,
+        max_entries: int = 256,
+        path: Optional[str] = None,
+    ) -> None:
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._model: Any = None
+        self._disabled = not self.is_supported()
+        self._namespaces: List[str] = []
+        self._values: List[Any] = []
+        self._matrix: Any = None
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path and not self._disabled:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_cache "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT, embedding BLOB, value TEXT)"
+            )
+            self._load()
+
+    @staticmethod
+    def is_supported() -> bool:
+        return SentenceTransformer is not None and np is not None
+
+    def embed(self, query: str) -> Optional[Any]:
+        """Return a normalised embedding for ``query`` or ``None`` when unavailable."""
+
+        if self._disabled:
+            return None
+        if self._model is None:
+            try:
+                self._model = SentenceTransformer(self.model_name)
+            except Exception:
+                self._disabled = True
+                return None
+        try:
+            return self._model.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0]
+        except Exception:
+            return None
+
+    def get(self, namespace: str, embedding: Any, threshold: Optional[float] = None) -> Optional[Any]:
+        with self._lock:
+            if self._matrix is None or not self._values:
+                return None
+            scores = self._matrix @ embedding
+            best_idx = -1
+            best_score = self.threshold if threshold is None else threshold
+            for idx, ns in enumerate(self._namespaces):
+                if ns == namespace and scores[idx] >= best_score:
+                    best_idx = idx
+                    best_score = float(scores[idx])
+            if best_idx < 0:
+                return None
+            value = self._values[best_idx]
+            self._move_to_end(best_idx)
+            return copy.deepcopy(value)
+
+    def put(self, namespace: str, embedding: Any, value: Any) -> None:
+        with self._lock:
+            self._append(namespace, embedding, copy.deepcopy(value))
+            if self._db is not None:
+                self._persist(namespace, embedding, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces.clear()
+            self._values.clear()
+            self._matrix = None
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM semantic_cache")
+
+    def __len__(self) -> int:  # pragma: no cover - convenience
+        with self._lock:
+            return len(self._values)
+
+    def _append(self, namespace: str, embedding: Any, value: Any) -> None:
+        if self._matrix is None:
+            self._matrix = embedding.reshape(1, -1)
+        else:
+            self._matrix = np.vstack([self._matrix, embedding])
+        self._namespaces.append(namespace)
+        self._values.append(value)
+        overflow = len(self._values) - self.max_entries
+        if overflow > 0:
+            self._matrix = self._matrix[overflow:]
+            del self._namespaces[:overflow]
+            del self._values[:overflow]
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            "SELECT namespace, embedding, value FROM semantic_cache ORDER BY id DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for namespace, blob, value in reversed(rows):
+            self._append(namespace, np.frombuffer(blob, dtype=np.float32), json.loads(value))
+
+    def _persist(self, namespace: str, embedding: Any, value: Any) -> None:
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return  # keep unserialisable responses in memory only
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO semantic_cache (namespace, embedding, value) VALUES (?, ?, ?)",
+                (namespace, np.asarray(embedding, dtype=np.float32).tobytes(), encoded),
+            )
+            self._db.execute("DELETE FROM semantic_cache WHERE id <= ?", (cursor.lastrowid - self.max_entries,))
+
+    def _move_to_end(self, idx: int) -> None:
+        # keep least-recently-used entries at the front for eviction
+        last = len(self._values) - 1
+        if idx == last:
+            return
+        order = list(range(idx)) + list(range(idx + 1, last + 1)) + [idx]
+        self._matrix = self._matrix[order]
+        self._namespaces.append(self._namespaces.pop(idx))
+        self._values.append(self._values.pop(idx))
@@ -2,22 +2,70 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import io
 import json
 import logging
-from difflib import SequenceMatcher
-from typing import Any, Dict, Iterable, List, Optional
+import os
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 try:
     import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+    from urllib3.util.retry import Retry  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
     requests = None  # type: ignore
 
+try:
+    import ahocorasick  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ahocorasick = None  # type: ignore
+
+try:
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore
+
+try:
+    from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    Retrying = None  # type: ignore
+
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ijson = None  # type: ignore
+
+try:
+    import msgspec  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+try:
+    from rapidfuzz import fuzz, process  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    fuzz = None  # type: ignore
+    process = None  # type: ignore
+
 from .adaptive_prompt import build_adaptive_prompt
+from .cache import DEFAULT_CACHE_MODEL, ExactCache, SemanticCache
 from .framework import DEFAULT_FRAMEWORK, FrameworkCategory
 from .retrieval import HeuristicRetriever, TextSegment, split_text_into_segments
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 multiplexing for the async client needs the optional ``h2`` package.
+_HTTP2_AVAILABLE = httpx is not None and importlib.util.find_spec("h2") is not None
+
 ADAPTIVE_TAB_SPECS = [
     ("hard_requirements", "废标项/硬性要求"),
     ("scoring_items", "评分项"),
@@ -27,6 +75,408 @@ ADAPTIVE_TAB_SPECS = [
     ("bid_timeline", "投标日历"),
 ]
 
+MAX_FRAMEWORK_DOCUMENT_CHARS = 20000
+# Evidence snippets whose character 5-gram Jaccard reaches this are treated as one passage.
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+_STUB_PROVIDERS = frozenset({"stub", "mock"})
+_OPENAI_PROVIDERS = frozenset({"openai", "openai_compatible"})
+_AZURE_PROVIDERS = frozenset({"azure_openai", "azure"})
+
+# System prompts are kept byte-identical across calls so providers can reuse cached prefixes.
+SEMANTIC_SYSTEM_PROMPT = "你是投标文件分析助手，输出 JSON"
+SUMMARY_SYSTEM_PROMPT = "你是投标标书分析助手，必须返回 JSON。"
+FRAMEWORK_SYSTEM_PROMPT = "你是投标标书分析专家，必须按要求返回 JSON，禁止虚构。"
+
+SUMMARY_INSTRUCTION = (
+    "你是一名投标文件分析专家。请仅依据 evidences 内容，提取与 rule 描述相关的明确条款或要求。"
+    "返回 JSON：{\"summary\": string, \"items\": [{\"requirement\": string, \"evidence\": string}] }。"
+    "summary 为总体概述；items 中每一项的 requirement 需引用或紧贴原文，evidence 必须摘自提供的 evidences 文本，"
+    "若无足够信息则返回空数组。禁止臆造。"
+)
+
+FRAMEWORK_RETRY_NOTE = (
+    "上一次回答没有给出任何要点。请重新逐段通读 document，检查每个类别是否有遗漏，"
+    "尽量为每个类别给出至少一条有原文依据的 items；确实没有相关内容的类别 items 可为空，仍然严禁杜撰。"
+)
+# the retry samples a little so it does not reproduce the empty first answer verbatim
+FRAMEWORK_RETRY_TEMPERATURE = 0.4
+
+BATCH_SUMMARY_INSTRUCTION = (
+    "你是一名投标文件分析专家。jobs 中每一项包含一条 rule 及其 evidences，请逐项仅依据该项 evidences，"
+    "提取与 rule 描述相关的明确条款或要求。返回 JSON：{\"results\": [{\"job_id\": int, \"summary\": string, "
+    "\"items\": [{\"requirement\": string, \"evidence\": string}]}]}。每个 job_id 返回一项；"
+    "requirement 需引用或紧贴原文，evidence 必须摘自该项 evidences 文本，若无足够信息则 items 为空数组。禁止臆造。"
+)
+BATCH_SEMANTIC_INSTRUCTION = (
+    "对 jobs 中每一项，找出与其 hints 强相关的段落。返回 JSON：{\"results\": [{\"job_id\": int, "
+    "\"candidates\": [{\"start\": int, \"length\": int, \"evidence\": string}]}]}。"
+    "每个 job_id 返回一项；start/length 基于整份文本的字符索引，若无匹配 candidates 为空数组。"
+)
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        # rule dicts come from user YAML and may carry int keys, which stdlib json accepts
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    """Encode a request body straight to UTF-8 JSON bytes."""
+
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(content: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# Alternative keys models use for the same summary fields, in preference order.
+_SUMMARY_KEYS = ("summary", "main", "overview")
+_ITEMS_KEYS = ("items", "bullet_points")
+_REQ_KEYS = ("requirement", "text", "point")
+_EV_KEYS = ("evidence", "quote", "source")
+
+
+def _pick(mapping: Dict[str, Any], keys: Tuple[str, ...], default: Any = None) -> Any:
+    """Return the first truthy value among ``keys`` (like chained ``or``), else ``default``."""
+
+    for key in keys:
+        value = mapping.get(key)
+        if value:
+            return value
+    return default
+
+
+def _safe_int(value: Any) -> Optional[int]:
+    """Coerce ``value`` to ``int``, returning ``None`` for missing or malformed values."""
+
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped.lstrip("-").isdecimal():
+            return int(stripped)
+    return None
+
+
+def _decode_content(content: Any) -> Any:
+    """Decode message content, passing through values a client shim already parsed."""
+
+    if isinstance(content, (dict, list)):
+        return content
+    return _loads(content)
+
+
+if msgspec is not None:
+    # The framework schema exactly as the prompt asks for it. Unknown keys (aliases such
+    # as ``name``/``level``), nulls and off-schema types fail validation and are left to
+    # the hand-written normalization in ``_parse_framework_response``.
+    class _FrameworkItem(msgspec.Struct, forbid_unknown_fields=True):
+        title: str = ""
+        description: str = ""
+        evidence: str = ""
+        recommendation: str = ""
+        severity: str = ""
+
+    class _FrameworkCategoryOut(msgspec.Struct, forbid_unknown_fields=True):
+        id: Any = None
+        title: Any = None
+        summary: str = ""
+        items: List[_FrameworkItem] = []
+
+    class _Milestone(msgspec.Struct, forbid_unknown_fields=True):
+        name: str = ""
+        deadline: str = ""
+        note: str = ""
+
+    class _Timeline(msgspec.Struct, forbid_unknown_fields=True):
+        milestones: List[_Milestone] = []
+        remark: str = ""
+
+    class _FrameworkResponse(msgspec.Struct):
+        categories: List[_FrameworkCategoryOut] = []
+        timeline: _Timeline = msgspec.field(default_factory=_Timeline)
+
+    _FRAMEWORK_DECODER: Any = msgspec.json.Decoder(_FrameworkResponse)
+else:
+    _FRAMEWORK_DECODER = None
+
+
+def _decode_framework_typed(content: Any) -> Optional[Dict[str, Any]]:
+    """Decode and validate a schema-conforming framework answer in one pass, else ``None``."""
+
+    if _FRAMEWORK_DECODER is None or not isinstance(content, (str, bytes)):
+        return None
+    try:
+        decoded = _FRAMEWORK_DECODER.decode(content)
+    except msgspec.MsgspecError:
+        return None
+    categories = [
+        {
+            "id": cat.id,
+            "title": cat.title,
+            "summary": cat.summary,
+            "items": [
+                {
+                    "title": item.title.strip(),
+                    "description": item.description.strip(),
+                    "evidence": item.evidence.strip(),
+                    "recommendation": item.recommendation.strip(),
+                    "severity": (item.severity or "medium").lower(),
+                }
+                for item in cat.items
+            ],
+        }
+        for cat in decoded.categories
+    ]
+    timeline = decoded.timeline
+    milestones = [
+        {"name": m.name.strip(), "deadline": m.deadline.strip(), "note": m.note.strip()} for m in timeline.milestones
+    ]
+    return {"categories": categories, "timeline": {"milestones": milestones, "remark": timeline.remark}}
+
+
+def _salvage_framework(content: Any) -> Optional[Dict[str, Any]]:
+    """Recover the complete ``categories`` entries (and ``timeline``) from a truncated/malformed body."""
+
+    if ijson is None or not isinstance(content, str):
+        return None
+    data = content.encode("utf-8")
+    categories: List[Any] = []
+    try:
+        for cat in ijson.items(io.BytesIO(data), "categories.item", use_float=True):
+            categories.append(cat)
+    except Exception:  # the incremental parser stops at the first bad token; keep what came before it
+        pass
+    timeline: Any = None
+    try:
+        timeline = next(ijson.items(io.BytesIO(data), "timeline", use_float=True), None)
+    except Exception:
+        timeline = None
+    if not categories and timeline is None:
+        return None
+    return {"categories": categories, "timeline": timeline or {}}
+
+
+def _chat_messages(system: str, user: str) -> List[Dict[str, str]]:
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def _framework_cache_parts(text: str, categories: List[FrameworkCategory]) -> List[str]:
+    return [text, *(f"{c.id}|{c.title}|{c.description}|{c.severity}" for c in categories)]
+
+
+def _framework_is_empty(result: Dict[str, Any]) -> bool:
+    return not any(cat.get("items") for cat in result.get("categories") or [])
+
+
+def _is_model_result(result: Any) -> bool:
+    # heuristic fallbacks (timeouts, HTTP errors) must not be served from the cache later
+    return bool(result) and result.get("raw_response") not in {"heuristic", "timeout"}
+
+
+def _is_framework_result(result: Any) -> bool:
+    # an answer still without any item after the retries is worth asking again next time
+    return _is_model_result(result) and not _framework_is_empty(result)
+
+
+def _is_adaptive_result(result: Any) -> bool:
+    # unparsable answers come back as the empty default tabs
+    return _is_model_result(result) and bool(
+        result.get("summary") or any(tab.get("items") for tab in result.get("tabs") or [])
+    )
+
+
+def _is_summary_result(result: Any) -> bool:
+    return bool(result) and bool(result.get("summary") or result.get("items"))
+
+
+def _truncate_utf8(value: str, max_bytes: int) -> str:
+    """Cut ``value`` to at most ``max_bytes`` of UTF-8 without splitting a character."""
+
+    if len(value) * 4 <= max_bytes:
+        return value
+    return value.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+
+def _trim_evidences(evidences: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    trimmed = []
+    kept: List[Set[str]] = []
+    for idx, ev in enumerate(evidences, start=1):
+        text = (ev.get("snippet") or ev.get("evidence") or "").strip()
+        if not text:
+            continue
+        text = text[:1200]
+        # keyword and semantic hits often quote the same passage, and boilerplate
+        # clauses repeat with small edits; send each passage once
+        shingles = _shingles(text, 5)
+        if any(_jaccard(shingles, other) >= NEAR_DUPLICATE_THRESHOLD for other in kept):
+            continue
+        kept.append(shingles)
+        trimmed.append({"id": idx, "text": text})
+        if len(trimmed) >= 6:
+            break
+    return trimmed
+
+
+def _read_content(response: Any) -> str:
+    """Return the assistant message of a chat completion, parsing the body once."""
+
+    return _loads(response.content)["choices"][0]["message"]["content"]
+
+
+def _read_stream(response: Any) -> str:
+    """Concatenate ``delta.content`` pieces of a server-sent-events chat completion."""
+
+    parts: List[str] = []
+    for line in response.iter_lines():
+        if not line or not line.startswith(b"data:"):
+            continue
+        chunk = line[5:].strip()
+        if chunk == b"[DONE]":
+            break
+        choices = _loads(chunk).get("choices") or []
+        if choices:
+            piece = (choices[0].get("delta") or {}).get("content")
+            if piece:
+                parts.append(piece)
+    return "".join(parts)
+
+
+def _shingles(value: str, size: int = 2) -> Set[str]:
+    if len(value) <= size:
+        return {value} if value else set()
+    return {value[i : i + size] for i in range(len(value) - size + 1)}
+
+
+def _normalize(value: str) -> str:
+    """Fold fullwidth/halfwidth and compatibility variants plus case, for matching only."""
+
+    return unicodedata.normalize("NFKC", value).casefold()
+
+
+def _jaccard(left: Set[str], right: Set[str]) -> float:
+    union = len(left | right)
+    return len(left & right) / union if union else 1.0
+
+
+def _best_ratio(text: str, candidates: Sequence[str]) -> float:
+    """Return the best similarity (0-1) between ``text`` and any of ``candidates``."""
+
+    if not candidates:
+        return 0.0
+    if process is not None:
+        match = process.extractOne(text, candidates, scorer=fuzz.ratio)
+        return match[1] / 100.0 if match else 0.0
+    # Without rapidfuzz, Jaccard over character bigrams (C-level set ops) ranks
+    # short Chinese strings about as well as SequenceMatcher at a fraction of the cost.
+    text_shingles = _shingles(text)
+    best = 0.0
+    for candidate in candidates:
+        other = _shingles(candidate)
+        if text_shingles or other:
+            best = max(best, _jaccard(text_shingles, other))
+    return best
+
+
+def _best_ratios(texts: Sequence[str], candidates: Sequence[str]) -> List[float]:
+    """Vectorised ``_best_ratio``: the best candidate similarity for each of ``texts``."""
+
+    if not candidates:
+        return [0.0] * len(texts)
+    if process is not None and len(texts) > 1:
+        try:
+            matrix = process.cdist(texts, candidates, scorer=fuzz.ratio, workers=-1, dtype="float64")
+        except ImportError:  # pragma: no cover - cdist needs numpy
+            pass
+        else:
+            return [float(value) / 100.0 for value in matrix.max(axis=1)]
+    return [_best_ratio(text, candidates) for text in texts]
+
+
+# Keyed on the text itself: str caches its hash, so a hit costs one memcmp and
+# several rules / retries over the same document share one segmentation. The key pins
+# the whole document, so only the last couple are kept (each may be megabytes).
+@lru_cache(maxsize=2)
+def _document_segments(text: str, max_chars: int) -> Tuple[TextSegment, ...]:
+    return tuple(split_text_into_segments(text, max_chars=max_chars))
+
+
+@lru_cache(maxsize=2)
+def _adaptive_prompt(text: str) -> Dict[str, Any]:
+    # callers only read the payload (``_adaptive_messages`` copies the message list)
+    return build_adaptive_prompt(text)
+
+
+@lru_cache(maxsize=8)
+def _framework_matcher(keywords: Tuple[Tuple[str, ...], ...]) -> Tuple[Any, FrozenSet[int]]:
+    """``(automaton or None, indices of categories that match everything)`` for normalized keywords."""
+
+    always = frozenset(idx for idx, kws in enumerate(keywords) if "" in kws)  # "" is a substring of everything
+    if ahocorasick is None:
+        return None, always
+    automaton = ahocorasick.Automaton()
+    for idx, kws in enumerate(keywords):
+        for kw in kws:
+            if not kw:
+                continue
+            if kw in automaton:
+                automaton.get(kw).add(idx)
+            else:
+                automaton.add_word(kw, {idx})
+    if not len(automaton):
+        return None, always
+    automaton.make_automaton()
+    return automaton, always
+
+
+def _framework_keywords(categories: List[FrameworkCategory]) -> Tuple[Tuple[str, ...], ...]:
+    return tuple(tuple(_normalize(kw) for kw in cat.title.split("/")) for cat in categories)
+
+
+def _framework_hits(text: str, keywords: Tuple[Tuple[str, ...], ...]) -> bool:
+    """Whether any category keyword occurs anywhere in ``text`` (one scan, before segmenting)."""
+
+    automaton, always = _framework_matcher(keywords)
+    if always:
+        return True
+    haystack = _normalize(text)
+    if automaton is not None:
+        return next(automaton.iter(haystack), None) is not None
+    return any(kw in haystack for kws in keywords for kw in kws if kw)
+
+
+def _match_framework_segments(
+    segments: Sequence[TextSegment], keywords: Tuple[Tuple[str, ...], ...]
+) -> List[List[str]]:
+    """Return, per category, the segment texts containing any of its normalized keywords."""
+
+    # normalize each segment once, not once per (category, segment) pair
+    haystacks = [_normalize(seg.text) for seg in segments]
+    automaton, always = _framework_matcher(keywords)
+    if ahocorasick is None:
+        pairs = list(zip(segments, haystacks))
+        return [[seg.text for seg, hay in pairs if any(kw in hay for kw in kws)] for kws in keywords]
+
+    # One automaton pass per segment instead of a substring scan per keyword.
+    snippets: List[List[str]] = [[] for _ in keywords]
+    for seg, hay in zip(segments, haystacks):
+        matched = set(always)
+        if automaton is not None:
+            for _, indices in automaton.iter(hay):
+                matched |= indices
+        for idx in matched:
+            snippets[idx].append(seg.text)
+    return snippets
+
 
 class LLMClient:
     """Wrapper around different LLM providers for semantic tasks."""
@@ -38,6 +488,7 @@ class LLMClient:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         timeout: int = 30,
+        disable_cache: bool = False,
         **kwargs: Any,
     ) -> None:
         self.provider = provider
@@ -48,8 +499,39 @@ class LLMClient:
         self.options = kwargs
         self._heuristic = HeuristicRetriever()
         self._no_proxy = {"http": None, "https": None}
+        self._session = self._build_session()
+        self._exact_cache: Optional[ExactCache] = None
+        self._semantic_cache: Optional[SemanticCache] = None
+        if not disable_cache:
+            self._exact_cache = ExactCache(
+                max_entries=int(kwargs.get("exact_cache_size", 512)),
+                directory=kwargs.get("cache_dir"),
+            )
+        # near-duplicate reuse is opt-in: a similar request is not the same document
+        semantic = kwargs.get("semantic_cache") or kwargs.get("document_semantic_cache")
+        if semantic and not disable_cache and SemanticCache.is_supported():
+            self._semantic_cache = SemanticCache(
+                model_name=kwargs.get("semantic_cache_model") or DEFAULT_CACHE_MODEL,
+                threshold=float(kwargs.get("semantic_cache_threshold", 0.87)),
+                path=kwargs.get("semantic_cache_path"),
+            )
+        # fallback preview segments per document, keyed by id() of the text object
+        self._segment_cache: Dict[int, Tuple[str, List[str]]] = {}
+        self._hints_norm_cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._aclient: Any = None
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     # ------------------------------------------------------------------ public
+    def reset_cache(self) -> None:
+        """Drop cached responses and per-document segmentation."""
+
+        self._segment_cache.clear()
+        self._hints_norm_cache.clear()
+        if self._exact_cache is not None:
+            self._exact_cache.clear()
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+
     def semantic_locate(
         self,
         text: str,
@@ -57,66 +539,561 @@ class LLMClient:
         rule: Dict[str, Any],
         segments: Optional[Iterable[Any]] = None,
     ) -> Optional[List[Dict[str, Any]]]:
+        # Materialise once: callers may pass a generator, and every consumer below walks it.
+        hints = tuple(h for h in hints if h)
         provider = (self.provider or "stub").lower()
-        if provider in {"stub", "mock"}:
+        if provider in _STUB_PROVIDERS:
             return self._heuristic_semantic(text, hints, segments)
-        if provider in {"openai", "openai_compatible"}:
-            return self._call_openai(text, hints, rule, segments)
-        if provider in {"azure_openai", "azure"}:
-            return self._call_azure(text, hints, rule, segments)
-        # Extend with more providers when needed
-        raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
+        self._require_remote(provider)
+        if segments is not None:
+            segments = list(segments)
+        return self._cached(
+            *self._semantic_cache_args(text, hints, rule, segments),
+            lambda: self._call_semantic(text, hints, rule, segments),
+        )
+
+    def semantic_locate_batch(
+        self,
+        tasks: Sequence[Tuple[Any, ...]],
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """Run several ``semantic_locate`` calls concurrently.
+
+        Each task is a ``(text, hints, rule[, segments])`` tuple; results keep the task order.
+        Remote calls are I/O bound, so they are issued from a thread pool sharing the session.
+        """
+
+        if not tasks:
+            return []
+        provider = (self.provider or "stub").lower()
+        workers = min(len(tasks), max(1, int(self.options.get("concurrency", 4))))
+        if provider in _STUB_PROVIDERS or workers == 1:
+            return [self.semantic_locate(*task) for task in tasks]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda task: self.semantic_locate(*task), tasks))
 
     def summarize_rule(self, rule: Dict[str, Any], evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
         provider = (self.provider or "stub").lower()
-        if provider in {"stub", "mock"}:
-            items = []
-            for ev in evidences:
-                text = (ev.get("snippet") or ev.get("evidence") or "").strip()
-                if not text:
-                    continue
-                items.append({"requirement": text, "evidence": text})
-                if len(items) >= 5:
-                    break
-            return {"summary": rule.get("description"), "items": items}
-        if provider in {"openai", "openai_compatible"}:
-            return self._call_openai_summary(rule, evidences)
-        if provider in {"azure_openai", "azure"}:
-            return self._call_azure_summary(rule, evidences)
-        raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
+        if provider in _STUB_PROVIDERS:
+            return self._stub_summary(rule, evidences)
+        self._require_remote(provider)
+        return self._cached(
+            *self._summary_cache_args(rule, evidences),
+            lambda: self._call_summary(rule, evidences),
+            cacheable=_is_summary_result,
+        )
+
+    def semantic_locate_many(
+        self,
+        text: str,
+        jobs: Sequence[Tuple[Dict[str, Any], Iterable[str], Optional[Iterable[Any]]]],
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """Locate evidence for several ``(rule, hints, segments)`` jobs on one document.
+
+        Uncached jobs are packed into shared chat requests (``batch_size`` per request);
+        jobs the model leaves unanswered fall back to individual ``semantic_locate`` calls.
+        """
+
+        jobs = [(rule, tuple(h for h in hints if h), None if segs is None else list(segs)) for rule, hints, segs in jobs]
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return [self._heuristic_semantic(text, hints, segs) for _, hints, segs in jobs]
+        self._require_remote(provider)
+        return self._run_batched(
+            "batch_semantic_locate",
+            BATCH_SEMANTIC_INSTRUCTION,
+            SEMANTIC_SYSTEM_PROMPT,
+            [
+                (
+                    self._semantic_cache_args(text, hints, rule, segs),
+                    {
+                        "rule": {"id": rule.get("id"), "description": rule.get("description"), "category": rule.get("category")},
+                        "hints": list(hints),
+                        "segments": self._preview_segments(text, segs),
+                    },
+                )
+                for rule, hints, segs in jobs
+            ],
+            self._parse_semantic_response,
+            lambda idx: self.semantic_locate(text, jobs[idx][1], jobs[idx][0], jobs[idx][2]),
+        )
+
+    def summarize_rules(
+        self,
+        rules: Sequence[Dict[str, Any]],
+        evidences_per_rule: Sequence[List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Batched ``summarize_rule``: one chat request covers up to ``batch_size`` rules."""
+
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return [self._stub_summary(rule, evs) for rule, evs in zip(rules, evidences_per_rule)]
+        self._require_remote(provider)
+        return self._run_batched(
+            "batch_extract_rule_requirements",
+            BATCH_SUMMARY_INSTRUCTION,
+            SUMMARY_SYSTEM_PROMPT,
+            [
+                (self._summary_cache_args(rule, evs), {"rule": rule, "evidences": _trim_evidences(evs)})
+                for rule, evs in zip(rules, evidences_per_rule)
+            ],
+            self._parse_summary_response,
+            lambda idx: self.summarize_rule(rules[idx], evidences_per_rule[idx]),
+            cacheable=_is_summary_result,
+        )
+
+    def analyze_framework(
+        self, text: str, categories: List[FrameworkCategory] | None = None, *, attempts: int = 2
+    ) -> Dict[str, Any]:
+        """Framework overview of ``text``; an answer without any item is retried up to ``attempts`` calls."""
 
-    def analyze_framework(self, text: str, categories: List[FrameworkCategory] | None = None) -> Dict[str, Any]:
         selected = categories or DEFAULT_FRAMEWORK
         provider = (self.provider or "stub").lower()
-        if provider in {"stub", "mock"}:
+        if provider in _STUB_PROVIDERS:
             return self._heuristic_framework(text, selected)
-        if provider in {"openai", "openai_compatible"}:
-            return self._call_openai_framework(text, selected)
-        if provider in {"azure_openai", "azure"}:
-            return self._call_azure_framework(text, selected)
-        raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
+        self._require_remote(provider)
+        return self._cached(
+            *self._framework_cache_args(text, selected),
+            lambda: self._call_framework(text, selected, attempts),
+            cacheable=_is_framework_result,
+            threshold=self._document_threshold(),
+        )
 
     def analyze_adaptive(self, text: str) -> Dict[str, Any]:
-        prompt_payload = build_adaptive_prompt(text)
         provider = (self.provider or "stub").lower()
-        if provider in {"stub", "mock"}:
+        if provider in _STUB_PROVIDERS:
             return self._heuristic_adaptive(text)
-        if provider in {"openai", "openai_compatible"}:
-            return self._call_openai_adaptive(prompt_payload)
-        if provider in {"azure_openai", "azure"}:
-            return self._call_azure_adaptive(prompt_payload)
-        raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
+        self._require_remote(provider)
+        return self._cached(
+            *self._adaptive_cache_args(text),
+            lambda: self._call_adaptive(_adaptive_prompt(text)),
+            cacheable=_is_adaptive_result,
+            threshold=self._document_threshold(),
+        )
+
+    # ------------------------------------------------------------------- async
+    async def asemantic_locate(
+        self,
+        text: str,
+        hints: Iterable[str],
+        rule: Dict[str, Any],
+        segments: Optional[Iterable[Any]] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Async ``semantic_locate``; gather many of these to fan rule lookups out over one client."""
+
+        hints = tuple(h for h in hints if h)
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return self._heuristic_semantic(text, hints, segments)
+        if httpx is None:
+            return await self._acall(self.semantic_locate, text, hints, rule, segments)
+        if segments is not None:
+            segments = list(segments)
+
+        async def compute() -> List[Dict[str, Any]]:
+            prompt = self._build_semantic_prompt(text, hints, rule, segments)
+            return self._parse_semantic_response(await self._achat(SEMANTIC_SYSTEM_PROMPT, prompt))
+
+        return await self._acached(*self._semantic_cache_args(text, hints, rule, segments), compute)
+
+    async def asummarize_rule(self, rule: Dict[str, Any], evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return self._stub_summary(rule, evidences)
+        if httpx is None:
+            return await self._acall(self.summarize_rule, rule, evidences)
+
+        async def compute() -> Dict[str, Any]:
+            prompt = self._build_summary_prompt(rule, evidences)
+            content = await self._achat(SUMMARY_SYSTEM_PROMPT, prompt, **self._response_format())
+            return self._parse_summary_response(content)
+
+        return await self._acached(*self._summary_cache_args(rule, evidences), compute, cacheable=_is_summary_result)
+
+    async def aanalyze_framework(
+        self, text: str, categories: List[FrameworkCategory] | None = None, *, attempts: int = 2
+    ) -> Dict[str, Any]:
+        selected = categories or DEFAULT_FRAMEWORK
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return self._heuristic_framework(text, selected)
+        if httpx is None:
+            return await self._acall(self.analyze_framework, text, selected, attempts=attempts)
+
+        async def compute() -> Dict[str, Any]:
+            result: Dict[str, Any] = {}
+            for attempt in range(1, max(1, attempts) + 1):
+                prompt, extra = self._framework_attempt(text, selected, attempt)
+                try:
+                    content = await self._achat(FRAMEWORK_SYSTEM_PROMPT, prompt, **extra)
+                except httpx.HTTPStatusError as exc:
+                    body = exc.response.text
+                    logger.warning("LLM HTTPError (%s): %s", exc, body)
+                    return self._framework_fallback(text, selected, body)
+                result = self._parse_framework_response(content)
+                result.setdefault("raw_response", content)
+                result["attempts"] = attempt
+                if not _framework_is_empty(result):
+                    break
+            return result
+
+        return await self._acached(
+            *self._framework_cache_args(text, selected),
+            compute,
+            cacheable=_is_framework_result,
+            threshold=self._document_threshold(),
+        )
+
+    async def aanalyze_adaptive(self, text: str) -> Dict[str, Any]:
+        provider = (self.provider or "stub").lower()
+        if provider in _STUB_PROVIDERS:
+            return self._heuristic_adaptive(text)
+        if httpx is None:
+            return await self._acall(self.analyze_adaptive, text)
+
+        async def compute() -> Dict[str, Any]:
+            prompt_payload = _adaptive_prompt(text)
+            url, payload = self._chat_request(
+                self._adaptive_messages(prompt_payload), **self._response_format(), stream=False
+            )
+            try:
+                response = await self._apost_json(url, payload)
+                content = _read_content(response)
+                parsed = self._parse_adaptive_response(content)
+                parsed.setdefault("raw_response", content)
+                return parsed
+            except httpx.TimeoutException as exc:
+                logger.warning("Adaptive LLM timeout: %s", exc)
+                return self._adaptive_fallback(text, "timeout")
+            except httpx.HTTPStatusError as exc:
+                body = exc.response.text
+                logger.warning("Adaptive LLM HTTPError (%s): %s", exc, body)
+                return self._adaptive_fallback(text, body)
+
+        return await self._acached(
+            *self._adaptive_cache_args(text), compute, cacheable=_is_adaptive_result, threshold=self._document_threshold()
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client, if one was opened."""
+
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     # ----------------------------------------------------------------- helpers
+    @staticmethod
+    def _semantic_cache_args(
+        text: str, hints: Tuple[str, ...], rule: Dict[str, Any], segments: Optional[List[Any]]
+    ) -> Tuple[str, List[str], None]:
+        # exact tier only: the answer holds offsets and quotes into this very document,
+        # which a near-duplicate (same boilerplate opening) would not share
+        segment_keys = [f"{getattr(seg, 'start', '')}:{getattr(seg, 'length', '')}" for seg in segments or []]
+        return f"semantic_locate:{rule.get('id')}", [text, *hints, *segment_keys], None
+
+    def _framework_cache_args(
+        self, text: str, categories: List[FrameworkCategory]
+    ) -> Tuple[str, List[str], Optional[str]]:
+        namespace = "analyze_framework:" + ",".join(cat.id for cat in categories)
+        return namespace, _framework_cache_parts(text, categories), self._document_query(text)
+
+    def _adaptive_cache_args(self, text: str) -> Tuple[str, List[str], Optional[str]]:
+        return "analyze_adaptive", [text], self._document_query(text)
+
+    def _document_query(self, text: str) -> Optional[str]:
+        # Whole-document answers are reused for near-duplicate tenders only on request:
+        # tenders cut from one template can still differ in amounts and dates.
+        if not self.options.get("document_semantic_cache"):
+            return None
+        return text[:4096]
+
+    def _document_threshold(self) -> float:
+        return float(self.options.get("document_cache_threshold", 0.93))
+
+    def _summary_cache_args(
+        self, rule: Dict[str, Any], evidences: List[Dict[str, Any]]
+    ) -> Tuple[str, List[str], Optional[str]]:
+        texts = [ev.get("snippet") or ev.get("evidence") or "" for ev in evidences]
+        # summaries are text-only, so near-duplicate evidences may share one (``semantic_cache: true``)
+        query = "\n".join(texts)[:2000] if self.options.get("semantic_cache") else None
+        return f"summarize_rule:{rule.get('id')}", texts, query
+
+    @staticmethod
+    def _stub_summary(rule: Dict[str, Any], evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
+        items = []
+        for ev in evidences:
+            text = (ev.get("snippet") or ev.get("evidence") or "").strip()
+            if not text:
+                continue
+            items.append({"requirement": text, "evidence": text})
+            if len(items) >= 5:
+                break
+        return {"summary": rule.get("description"), "items": items}
+
+    def _cache_lookup(
+        self, namespace: str, exact_parts: Sequence[str], query: Optional[str], threshold: Optional[float] = None
+    ) -> Tuple[Any, Any, Any]:
+        """Return ``(cached, exact_key, embedding)``; ``cached`` is ``None`` on a miss.
+
+        The exact tier is checked first (hash of provider/model + ``namespace`` +
+        ``exact_parts``) so repeated requests skip both the embedding model and the LLM.
+        A ``query`` of ``None`` restricts the lookup to the exact tier; ``threshold``
+        overrides the semantic cache's similarity cut-off for this lookup.
+        """
+
+        exact = self._exact_cache
+        key = None
+        if exact is not None:
+            key = exact.make_key([self.provider or "", self.model or "", namespace, *exact_parts])
+            cached = exact.get(key)
+            if cached is not None:
+                return cached, key, None
+        cache = self._semantic_cache
+        embedding = cache.embed(query) if cache is not None and query is not None else None
+        if embedding is not None:
+            cached = cache.get(namespace, embedding, threshold)
+            if cached is not None:
+                return cached, key, embedding
+        return None, key, embedding
+
+    def _cache_store(
+        self, namespace: str, key: Any, embedding: Any, result: Any, cacheable: Callable[[Any], bool] = bool
+    ) -> None:
+        if not cacheable(result):
+            return
+        if key is not None:
+            self._exact_cache.put(key, result)
+        if embedding is not None:
+            self._semantic_cache.put(namespace, embedding, result)
+
+    def _run_batched(
+        self,
+        task: str,
+        instruction: str,
+        system_prompt: str,
+        jobs: Sequence[Tuple[Tuple[str, List[str], Optional[str]], Dict[str, Any]]],
+        parse_item: Callable[[Any], Any],
+        single: Callable[[int], Any],
+        cacheable: Callable[[Any], bool] = bool,
+    ) -> List[Any]:
+        """Answer ``(cache_args, job_payload)`` jobs from the cache, else in packed requests."""
+
+        results: List[Any] = [None] * len(jobs)
+        pending: List[Tuple[int, Any, Any]] = []
+        for idx, ((namespace, parts, query), _) in enumerate(jobs):
+            cached, key, embedding = self._cache_lookup(namespace, parts, query)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                pending.append((idx, key, embedding))
+
+        size = max(1, int(self.options.get("batch_size", 8)))
+        for offset in range(0, len(pending), size):
+            group = pending[offset : offset + size]
+            # static keys first so the instruction is part of the cacheable prefix
+            prompt = _dumps(
+                {
+                    "task": task,
+                    "instruction": instruction,
+                    "jobs": [{"job_id": n, **jobs[idx][1]} for n, (idx, _, _) in enumerate(group)],
+                }
+            )
+            answers: Dict[int, Any] = {}
+            try:
+                parsed = _decode_content(self._chat(system_prompt, prompt, **self._response_format()))
+                items = parsed.get("results") if isinstance(parsed, dict) else None
+                for item in items or []:
+                    job_id = _safe_int(item.get("job_id")) if isinstance(item, dict) else None
+                    if job_id is not None:
+                        answers[job_id] = item
+            except Exception as exc:
+                logger.warning("Batched %s request failed, falling back to single calls: %s", task, exc)
+            for n, (idx, key, embedding) in enumerate(group):
+                item = answers.get(n)
+                if item is None:
+                    results[idx] = single(idx)
+                    continue
+                value = parse_item(item)
+                self._cache_store(jobs[idx][0][0], key, embedding, value, cacheable)
+                results[idx] = value
+        return results
+
+    def _cached(
+        self,
+        namespace: str,
+        exact_parts: Sequence[str],
+        query: Optional[str],
+        compute: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = bool,
+        threshold: Optional[float] = None,
+    ) -> Any:
+        """Return a cached response for an identical or near-duplicate request, else compute and store it."""
+
+        cached, key, embedding = self._cache_lookup(namespace, exact_parts, query, threshold)
+        if cached is not None:
+            return cached
+        result = compute()
+        self._cache_store(namespace, key, embedding, result, cacheable)
+        return result
+
+    async def _acached(
+        self,
+        namespace: str,
+        exact_parts: Sequence[str],
+        query: Optional[str],
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = bool,
+        threshold: Optional[float] = None,
+    ) -> Any:
+        cached, key, embedding = self._cache_lookup(namespace, exact_parts, query, threshold)
+        if cached is not None:
+            return cached
+        result = await compute()
+        self._cache_store(namespace, key, embedding, result, cacheable)
+        return result
+
+    def _default_headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        provider = (self.provider or "stub").lower()
+        if provider in _AZURE_PROVIDERS:
+            api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
+            if api_key:
+                headers["api-key"] = api_key
+        else:
+            api_key = self.api_key or self.options.get("api_key")
+            if api_key:
+                headers["Authorization"] = f"Bearer {api_key}"
+        return headers
+
+    def _build_session(self) -> Any:
+        """Create one keep-alive session so repeated calls reuse the TCP/TLS connection."""
+
+        if requests is None:
+            return None
+        session = requests.Session()
+        session.headers.update(self._default_headers())
+        # Bounded keep-alive pool for concurrent batches; transient 429/5xx answers are
+        # retried with backoff (honouring Retry-After) before surfacing as HTTPError.
+        # Read errors are never retried: re-sending after the model started generating
+        # doubles the cost. Connection errors are left to tenacity when it is installed.
+        retry = Retry(
+            total=int(self.options.get("max_retries", 3)),
+            connect=0 if Retrying is not None else None,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _require_session(self) -> None:
+        if self._session is None:
+            raise RuntimeError("requests 库未安装，无法调用 LLM 接口")
+
+    def _require_remote(self, provider: str) -> None:
+        if provider not in _OPENAI_PROVIDERS and provider not in _AZURE_PROVIDERS:
+            # Extend with more providers when needed
+            raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
+
+    def _post_json(self, url: str, payload: Dict[str, Any], stream: bool = False) -> Any:
+        self._require_session()
+        data = _dumps_bytes(payload)
+        if Retrying is None:
+            return self._send(url, data, stream)
+        # Failed connects (refused, reset, DNS, connect timeout) are retried with jittered
+        # exponential backoff; the original exception is re-raised once attempts run out.
+        retrying = Retrying(
+            stop=stop_after_attempt(int(self.options.get("max_retries", 3)) + 1),
+            wait=wait_exponential_jitter(initial=0.3, max=5),
+            retry=retry_if_exception_type(requests.ConnectionError),
+            reraise=True,
+        )
+        return retrying(self._send, url, data, stream)
+
+    def _send(self, url: str, data: bytes, stream: bool) -> Any:
+        response = self._session.post(
+            url,
+            data=data,
+            timeout=self.timeout,
+            proxies=self._no_proxy,
+            stream=stream,
+        )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # read the (small) error body even when streaming: it releases the connection
+            # and keeps ``exc.response.text`` available to the handlers
+            _ = response.content
+            raise
+        return response
+
+    def _async_client(self) -> Any:
+        # Created lazily so sync-only callers never open an async pool; bound to the
+        # event loop that first uses it, so close it with ``aclose()`` before switching loops.
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                headers=self._default_headers(),
+                trust_env=False,
+            )
+        return self._aclient
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "Future[Any]":
+        # Blocking provider calls run on a dedicated pool (size from LLM_POOL) rather than the
+        # loop's default executor, so LLM fan-out cannot starve other to_thread users.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("LLM_POOL", "32")),
+                thread_name_prefix="llm",
+            )
+        return self._executor.submit(fn, *args, **kwargs)
+
+    async def _acall(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self._submit(fn, *args, **kwargs))
+
+    async def _apost_json(self, url: str, payload: Dict[str, Any]) -> Any:
+        response = await self._async_client().post(url, content=_dumps_bytes(payload))
+        response.raise_for_status()
+        return response
+
+    def _response_format(self) -> Dict[str, Any]:
+        # Opt-in: ask the provider to enforce a JSON object (OpenAI/Azure ``json_object`` mode).
+        if self.options.get("json_mode"):
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
+    def _normalized_hints(self, hints: Tuple[str, ...]) -> Tuple[str, ...]:
+        # The same rule hints come back for every document; normalize them once.
+        cached = self._hints_norm_cache.get(hints)
+        if cached is None:
+            if len(self._hints_norm_cache) >= 1024:
+                self._hints_norm_cache.clear()
+            cached = tuple(_normalize(h) for h in hints if h)
+            self._hints_norm_cache[hints] = cached
+        return cached
+
     def _heuristic_semantic(
         self,
         text: str,
         hints: Iterable[str],
         segments: Optional[Iterable[Any]] = None,
     ) -> List[Dict[str, Any]]:
+        hints_t = hints if isinstance(hints, tuple) else tuple(h for h in hints if h)
+        hints_norm = self._normalized_hints(hints_t)
         if segments is None:
-            segments = self._heuristic.locate_candidates(text, hints)
+            segments = self._heuristic.locate_candidates(text, hints_t)
         results: List[Dict[str, Any]] = []
+        # unscored evidences are fuzzy-scored together in one batch after the loop
+        pending: List[Tuple[Dict[str, Any], str]] = []
         for seg in segments:
             if isinstance(seg, TextSegment):
                 start = seg.start
@@ -132,249 +1109,120 @@ class LLMClient:
                     evidence = text[start : start + length]
             if not evidence:
                 continue
+            entry = {
+                "start": start,
+                "length": length or len(evidence),
+                "evidence": evidence,
+                "score": float(score),
+            }
+            results.append(entry)
             if not score:
-                hints_lower = [h.lower() for h in hints if h]
-                score = max(
-                    (SequenceMatcher(a=evidence.lower(), b=h).ratio() for h in hints_lower),
-                    default=0.0,
-                )
-            results.append(
-                {
-                    "start": start,
-                    "length": length or len(evidence),
-                    "evidence": evidence,
-                    "score": float(score),
-                }
-            )
+                evidence_norm = _normalize(evidence)
+                # a literal hint hit is the strongest signal; skip fuzzy scoring for it
+                if any(h in evidence_norm for h in hints_norm):
+                    entry["score"] = 1.0
+                else:
+                    pending.append((entry, evidence_norm))
+        if pending:
+            # overlapping retrievers often return the same snippet twice; score each text once
+            unique = list(dict.fromkeys(evidence_norm for _, evidence_norm in pending))
+            scores = dict(zip(unique, _best_ratios(unique, hints_norm)))
+            for entry, evidence_norm in pending:
+                entry["score"] = float(scores[evidence_norm])
         return results
 
     # ---------------------------------------------------------------- requests
-    def _call_openai(
-        self,
-        text: str,
-        hints: Iterable[str],
-        rule: Dict[str, Any],
-        segments: Optional[Iterable[Any]] = None,
-    ) -> List[Dict[str, Any]]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key")
-        if not api_key:
-            raise RuntimeError("缺少 OpenAI API key")
-        url = self.base_url or "https://api.openai.com/v1/chat/completions"
-        model = self.model or self.options.get("model") or "gpt-4o-mini"
-        prompt = self._build_semantic_prompt(text, hints, rule, segments)
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "你是投标文件分析助手，输出 JSON"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=self.timeout, proxies=self._no_proxy)
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        return self._parse_semantic_response(content)
+    @cached_property
+    def _endpoint(self) -> Tuple[str, Dict[str, Any]]:
+        """``(url, payload defaults)`` for the configured provider, resolved once per client."""
 
-    def _call_openai_summary(
-        self,
-        rule: Dict[str, Any],
-        evidences: List[Dict[str, Any]],
-    ) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key")
-        if not api_key:
-            raise RuntimeError("缺少 OpenAI API key")
-        url = self.base_url or "https://api.openai.com/v1/chat/completions"
-        model = self.model or self.options.get("model") or "gpt-4o-mini"
-        prompt = self._build_summary_prompt(rule, evidences)
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "你是投标标书分析助手，必须返回 JSON。"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=self.timeout, proxies=self._no_proxy)
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        return self._parse_summary_response(content)
+        provider = (self.provider or "stub").lower()
+        if provider in _OPENAI_PROVIDERS:
+            api_key = self.api_key or self.options.get("api_key")
+            if not api_key:
+                raise RuntimeError("缺少 OpenAI API key")
+            url = self.base_url or "https://api.openai.com/v1/chat/completions"
+            model = self.model or self.options.get("model") or "gpt-4o-mini"
+            return url, {"model": model}
+        if provider in _AZURE_PROVIDERS:
+            api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
+            endpoint = self.base_url or self.options.get("endpoint")
+            deployment = self.options.get("deployment") or self.model
+            if not (api_key and endpoint and deployment):
+                raise RuntimeError("Azure OpenAI 配置缺失 (api_key / endpoint / deployment)")
+            url = f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version=2023-07-01-preview"
+            return url, {}
+        # Extend with more providers when needed
+        raise NotImplementedError(f"LLM provider '{self.provider}' not implemented")
 
-    def _call_openai_adaptive(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key")
-        if not api_key:
-            raise RuntimeError("缺少 OpenAI API key")
-        url = self.base_url or "https://api.openai.com/v1/chat/completions"
-        model = self.model or self.options.get("model") or "gpt-4o-mini"
+    def _chat_request(self, messages: List[Dict[str, Any]], **extra: Any) -> Tuple[str, Dict[str, Any]]:
+        url, defaults = self._endpoint
+        return url, {**defaults, "messages": messages, "temperature": 0, **extra}
+
+    def _chat(self, system: str, user: str, **extra: Any) -> str:
+        """Send one system + user exchange and return the raw message content."""
+
+        url, payload = self._chat_request(_chat_messages(system, user), **extra)
+        return _read_content(self._post_json(url, payload))
+
+    async def _achat(self, system: str, user: str, **extra: Any) -> str:
+        url, payload = self._chat_request(_chat_messages(system, user), **extra)
+        return _read_content(await self._apost_json(url, payload))
+
+    @staticmethod
+    def _adaptive_messages(prompt_payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         system_prompt = prompt_payload.get("system")
         messages = prompt_payload.get("messages") or []
         assembled_messages: List[Dict[str, Any]] = []
         if system_prompt:
             assembled_messages.append({"role": "system", "content": system_prompt})
         assembled_messages.extend(messages)
-        payload = {
-            "model": model,
-            "messages": assembled_messages,
-            "temperature": 0,
-            "stream": False,
-        }
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout,
-                proxies=self._no_proxy,
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"]
-            parsed = self._parse_adaptive_response(content)
-            parsed.setdefault("raw_response", content)
-            return parsed
-        except (requests.Timeout, requests.ReadTimeout) as exc:
-            logger.warning("Adaptive LLM timeout: %s", exc)
-            fallback = self._heuristic_adaptive(prompt_payload.get("raw_text", ""))
-            fallback.setdefault("raw_response", "timeout")
-            return fallback
-        except requests.HTTPError as exc:
-            body = exc.response.text if exc.response is not None else ""
-            logger.warning("Adaptive LLM HTTPError (%s): %s", exc, body)
-            fallback = self._heuristic_adaptive(prompt_payload.get("raw_text", ""))
-            fallback.setdefault("raw_response", body)
-            return fallback
+        return assembled_messages
+
+    def _adaptive_fallback(self, text: str, raw_response: str) -> Dict[str, Any]:
+        fallback = self._heuristic_adaptive(text)
+        fallback.setdefault("raw_response", raw_response)
+        return fallback
 
-    def _call_azure(
+    def _call_semantic(
         self,
         text: str,
         hints: Iterable[str],
         rule: Dict[str, Any],
         segments: Optional[Iterable[Any]] = None,
     ) -> List[Dict[str, Any]]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 Azure OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
-        endpoint = self.base_url or self.options.get("endpoint")
-        deployment = self.options.get("deployment") or self.model
-        if not (api_key and endpoint and deployment):
-            raise RuntimeError("Azure OpenAI 配置缺失 (api_key / endpoint / deployment)")
-        url = f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version=2023-07-01-preview"
         prompt = self._build_semantic_prompt(text, hints, rule, segments)
-        payload = {
-            "messages": [
-                {"role": "system", "content": "你是投标文件分析助手，输出 JSON"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "api-key": api_key,
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=self.timeout, proxies=self._no_proxy)
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        return self._parse_semantic_response(content)
+        return self._parse_semantic_response(self._chat(SEMANTIC_SYSTEM_PROMPT, prompt))
 
-    def _call_azure_summary(
-        self,
-        rule: Dict[str, Any],
-        evidences: List[Dict[str, Any]],
-    ) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 Azure OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
-        endpoint = self.base_url or self.options.get("endpoint")
-        deployment = self.options.get("deployment") or self.model
-        if not (api_key and endpoint and deployment):
-            raise RuntimeError("Azure OpenAI 配置缺失 (api_key / endpoint / deployment)")
-        url = f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version=2023-07-01-preview"
+    def _call_summary(self, rule: Dict[str, Any], evidences: List[Dict[str, Any]]) -> Dict[str, Any]:
         prompt = self._build_summary_prompt(rule, evidences)
-        payload = {
-            "messages": [
-                {"role": "system", "content": "你是投标标书分析助手，必须返回 JSON。"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "api-key": api_key,
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, headers=headers, json=payload, timeout=self.timeout, proxies=self._no_proxy)
-        response.raise_for_status()
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-        return self._parse_summary_response(content)
+        return self._parse_summary_response(self._chat(SUMMARY_SYSTEM_PROMPT, prompt, **self._response_format()))
 
-    def _call_azure_adaptive(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 Azure OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
-        endpoint = self.base_url or self.options.get("endpoint")
-        deployment = self.options.get("deployment") or self.model
-        if not (api_key and endpoint and deployment):
-            raise RuntimeError("Azure OpenAI 配置缺失 (api_key / endpoint / deployment)")
-        url = f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version=2023-07-01-preview"
-        system_prompt = prompt_payload.get("system")
-        messages = prompt_payload.get("messages") or []
-        assembled_messages: List[Dict[str, Any]] = []
-        if system_prompt:
-            assembled_messages.append({"role": "system", "content": system_prompt})
-        assembled_messages.extend(messages)
-        payload = {
-            "messages": assembled_messages,
-            "temperature": 0,
-            "stream": False,
-        }
-        headers = {
-            "api-key": api_key,
-            "Content-Type": "application/json",
-        }
+    def _call_adaptive(self, prompt_payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._require_session()
+        # long adaptive outputs can be streamed so decoding overlaps with generation
+        stream = bool(self.options.get("stream", False))
+        url, payload = self._chat_request(
+            self._adaptive_messages(prompt_payload), **self._response_format(), stream=stream
+        )
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout,
-                proxies=self._no_proxy,
-            )
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
+            # closing returns a streamed connection to the pool even if reading fails midway
+            with self._post_json(url, payload, stream=stream) as response:
+                content = _read_stream(response) if stream else _read_content(response)
             parsed = self._parse_adaptive_response(content)
             parsed.setdefault("raw_response", content)
             return parsed
         except (requests.Timeout, requests.ReadTimeout) as exc:
-            logger.warning("Azure adaptive timeout: %s", exc)
-            fallback = self._heuristic_adaptive(prompt_payload.get("raw_text", ""))
-            fallback.setdefault("raw_response", "timeout")
-            return fallback
+            logger.warning("Adaptive LLM timeout: %s", exc)
+            return self._adaptive_fallback(prompt_payload.get("raw_text", ""), "timeout")
         except requests.HTTPError as exc:
             body = exc.response.text if exc.response is not None else ""
-            logger.warning("Azure adaptive HTTPError (%s): %s", exc, body)
-            fallback = self._heuristic_adaptive(prompt_payload.get("raw_text", ""))
-            fallback.setdefault("raw_response", body)
-            return fallback
+            logger.warning("Adaptive LLM HTTPError (%s): %s", exc, body)
+            return self._adaptive_fallback(prompt_payload.get("raw_text", ""), body)
+        except requests.RequestException as exc:
+            # e.g. ChunkedEncodingError / ConnectionError while the stream is being read
+            logger.warning("Adaptive LLM request failed: %s", exc)
+            return self._adaptive_fallback(prompt_payload.get("raw_text", ""), str(exc))
 
     # ---------------------------------------------------------------- parsing
     def _build_semantic_prompt(
@@ -384,7 +1232,17 @@ class LLMClient:
         rule: Dict[str, Any],
         segments: Optional[Iterable[Any]] = None,
     ) -> str:
-        hints_list = list(hints)
+        # static keys first, request-specific content last
+        prompt = {
+            "task": "semantic_locate",
+            "instruction": "找出与 hints 强相关的段落，返回 JSON 列表，每项包含 start, length, evidence。start/length 基于整份文本的字符索引。若无匹配返回空数组。",
+            "rule": {"id": rule.get("id"), "description": rule.get("description"), "category": rule.get("category")},
+            "hints": list(hints),
+            "segments": self._preview_segments(text, segments),
+        }
+        return _dumps(prompt)
+
+    def _preview_segments(self, text: str, segments: Optional[Iterable[Any]]) -> List[str]:
         preview_segments = []
         if segments:
             for seg in segments:
@@ -392,73 +1250,75 @@ class LLMClient:
                 if snippet:
                     preview_segments.append(snippet[:400])
         if not preview_segments:
-            # Provide fallback segments to reduce prompt size
-            fallback = split_text_into_segments(text, max_chars=400)
-            preview_segments = [seg.text for seg in fallback[:5]]
+            if len(text) <= 400:
+                # fits in a single preview segment, no need to segment it
+                stripped = text.strip()
+                preview_segments = [stripped] if stripped else []
+            else:
+                preview_segments = self._fallback_segments(text)
+        return preview_segments
 
-        prompt = {
-            "task": "semantic_locate",
-            "rule": {"id": rule.get("id"), "description": rule.get("description"), "category": rule.get("category")},
-            "hints": hints_list,
-            "segments": preview_segments,
-            "instruction": "找出与 hints 强相关的段落，返回 JSON 列表，每项包含 start, length, evidence。start/length 基于整份文本的字符索引。若无匹配返回空数组。",
-        }
-        return json.dumps(prompt, ensure_ascii=False)
+    def _fallback_segments(self, text: str) -> List[str]:
+        # The same document string is reused for every rule of an analysis run, so
+        # cache by identity; the stored text guards against a recycled id().
+        key = id(text)
+        cached = self._segment_cache.get(key)
+        if cached is not None and cached[0] is text:
+            return cached[1]
+        # Provide fallback segments to reduce prompt size
+        fallback = split_text_into_segments(text, max_chars=400)
+        preview = [seg.text for seg in fallback[:5]]
+        if len(self._segment_cache) >= 8:
+            self._segment_cache.clear()
+        self._segment_cache[key] = (text, preview)
+        return preview
 
     def _build_summary_prompt(self, rule: Dict[str, Any], evidences: List[Dict[str, Any]]) -> str:
-        trimmed = []
-        for idx, ev in enumerate(evidences, start=1):
-            text = (ev.get("snippet") or ev.get("evidence") or "").strip()
-            if not text:
-                continue
-            trimmed.append({"id": idx, "text": text[:1200]})
-            if len(trimmed) >= 6:
-                break
-
+        # static keys first, request-specific content last
         payload = {
             "task": "extract_rule_requirements",
+            "instruction": SUMMARY_INSTRUCTION,
             "rule": rule,
-            "evidences": trimmed,
-            "instruction": "你是一名投标文件分析专家。请仅依据 evidences 内容，提取与 rule 描述相关的明确条款或要求。返回 JSON：{\"summary\": string, \"items\": [{\"requirement\": string, \"evidence\": string}] }。summary 为总体概述；items 中每一项的 requirement 需引用或紧贴原文，evidence 必须摘自提供的 evidences 文本，若无足够信息则返回空数组。禁止臆造。",
+            "evidences": _trim_evidences(evidences),
         }
-        return json.dumps(payload, ensure_ascii=False)
+        return _dumps(payload)
 
-    def _parse_semantic_response(self, content: str) -> List[Dict[str, Any]]:
+    def _parse_semantic_response(self, content: Any) -> List[Dict[str, Any]]:
         try:
-            parsed = json.loads(content)
+            parsed = _decode_content(content)
             if isinstance(parsed, dict) and "candidates" in parsed:
                 candidates = parsed["candidates"]
             else:
                 candidates = parsed
             if not isinstance(candidates, list):
                 return []
-            results: List[Dict[str, Any]] = []
-            for item in candidates:
-                if not isinstance(item, dict):
-                    continue
-                start = int(item.get("start", 0))
-                length = int(item.get("length", 0))
-                evidence = item.get("evidence") or ""
-                results.append({"start": start, "length": length, "evidence": evidence})
-            return results
+            safe_int = _safe_int
+            # a candidate without parseable offsets would anchor at the document head; drop it
+            return [
+                {"start": start, "length": length, "evidence": item.get("evidence") or ""}
+                for item in candidates
+                if isinstance(item, dict)
+                and (start := safe_int(item.get("start"))) is not None
+                and (length := safe_int(item.get("length"))) is not None
+            ]
         except Exception:
             return []
 
-    def _parse_summary_response(self, content: str) -> Dict[str, Any]:
+    def _parse_summary_response(self, content: Any) -> Dict[str, Any]:
         try:
-            parsed = json.loads(content)
+            parsed = _decode_content(content)
             if not isinstance(parsed, dict):
                 return {}
-            summary = parsed.get("summary") or parsed.get("main") or parsed.get("overview")
-            items = parsed.get("items") or parsed.get("bullet_points") or []
+            summary = _pick(parsed, _SUMMARY_KEYS)
+            items = _pick(parsed, _ITEMS_KEYS, [])
             normalized = []
             if isinstance(items, dict):
                 items = [items]
             if isinstance(items, list):
                 for item in items:
                     if isinstance(item, dict):
-                        requirement = str(item.get("requirement") or item.get("text") or item.get("point") or "").strip()
-                        evidence = str(item.get("evidence") or item.get("quote") or item.get("source") or "").strip()
+                        requirement = str(_pick(item, _REQ_KEYS, "")).strip()
+                        evidence = str(_pick(item, _EV_KEYS, "")).strip()
                         if requirement:
                             normalized.append({"requirement": requirement, "evidence": evidence})
                     else:
@@ -517,11 +1377,11 @@ class LLMClient:
                 entry["items"] = self._normalise_adaptive_items(tab.get("items"))
         return [defaults[tab_id] for tab_id, _ in ADAPTIVE_TAB_SPECS]
 
-    def _parse_adaptive_response(self, content: str) -> Dict[str, Any]:
+    def _parse_adaptive_response(self, content: Any) -> Dict[str, Any]:
         if not content or not str(content).strip():
             return {"summary": "", "tabs": self._default_adaptive_tabs()}
         try:
-            parsed = json.loads(content)
+            parsed = _decode_content(content)
             if not isinstance(parsed, dict):
                 return {"summary": "", "tabs": self._default_adaptive_tabs()}
             summary = str(parsed.get("summary") or "").strip()
@@ -532,10 +1392,14 @@ class LLMClient:
             return {"summary": "", "tabs": self._default_adaptive_tabs()}
 
     def _heuristic_framework(self, text: str, categories: List[FrameworkCategory]) -> Dict[str, Any]:
-        segments = split_text_into_segments(text, max_chars=800)
+        keywords = _framework_keywords(categories)
+        if _framework_hits(text, keywords):
+            snippets_per_cat = _match_framework_segments(_document_segments(text, 800), keywords)
+        else:
+            # no category keyword anywhere: skip segmentation and per-segment scans
+            snippets_per_cat = [[] for _ in categories]
         result_categories = []
-        for cat in categories:
-            snippets = [seg.text for seg in segments if any(keyword in seg.text for keyword in cat.title.split("/"))]
+        for cat, snippets in zip(categories, snippets_per_cat):
             items = []
             for snippet in snippets[:5]:
                 items.append(
@@ -550,91 +1414,42 @@ class LLMClient:
             result_categories.append({"id": cat.id, "title": cat.title, "items": items, "summary": cat.description})
         return {"categories": result_categories, "timeline": {"milestones": [], "remark": ""}, "raw_response": "heuristic"}
 
-    def _call_openai_framework(
-        self,
-        text: str,
-        categories: List[FrameworkCategory],
-    ) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key")
-        if not api_key:
-            raise RuntimeError("缺少 OpenAI API key")
-        url = self.base_url or "https://api.openai.com/v1/chat/completions"
-        model = self.model or self.options.get("model") or "gpt-4o-mini"
-        prompt = self._build_framework_prompt(text, categories)
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "你是投标标书分析专家，必须按要求返回 JSON，禁止虚构。"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-        try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout,
-                proxies=self._no_proxy,
-            )
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
-            result = self._parse_framework_response(content)
-            result.setdefault("raw_response", content)
-            return result
-        except requests.HTTPError as exc:
-            body = exc.response.text if exc.response is not None else ""
-            logger.warning("LLM HTTPError (%s): %s", exc, body)
-            fallback = self._heuristic_framework(text, categories)
-            fallback.setdefault("raw_response", body)
-            return fallback
+    def _framework_fallback(self, text: str, categories: List[FrameworkCategory], raw_response: str) -> Dict[str, Any]:
+        fallback = self._heuristic_framework(text, categories)
+        fallback.setdefault("raw_response", raw_response)
+        return fallback
 
-    def _call_azure_framework(
-        self,
-        text: str,
-        categories: List[FrameworkCategory],
-    ) -> Dict[str, Any]:
-        if requests is None:
-            raise RuntimeError("requests 库未安装，无法调用 Azure OpenAI 接口")
-        api_key = self.api_key or self.options.get("api_key") or self.options.get("key")
-        endpoint = self.base_url or self.options.get("endpoint")
-        deployment = self.options.get("deployment") or self.model
-        if not (api_key and endpoint and deployment):
-            raise RuntimeError("Azure OpenAI 配置缺失 (api_key / endpoint / deployment)")
-        url = f"{endpoint.rstrip('/')}/openai/deployments/{deployment}/chat/completions?api-version=2023-07-01-preview"
-        prompt = self._build_framework_prompt(text, categories)
-        payload = {
-            "messages": [
-                {"role": "system", "content": "你是投标标书分析专家，必须按要求返回 JSON，禁止虚构。"},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0,
-        }
-        headers = {
-            "api-key": api_key,
-            "Content-Type": "application/json",
-        }
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=self.timeout, proxies=self._no_proxy)
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
+    def _call_framework(self, text: str, categories: List[FrameworkCategory], attempts: int = 1) -> Dict[str, Any]:
+        self._require_session()
+        result: Dict[str, Any] = {}
+        for attempt in range(1, max(1, attempts) + 1):
+            prompt, extra = self._framework_attempt(text, categories, attempt)
+            try:
+                content = self._chat(FRAMEWORK_SYSTEM_PROMPT, prompt, **extra)
+            except requests.HTTPError as exc:
+                body = exc.response.text if exc.response is not None else ""
+                logger.warning("LLM HTTPError (%s): %s", exc, body)
+                return self._framework_fallback(text, categories, body)
             result = self._parse_framework_response(content)
             result.setdefault("raw_response", content)
-            return result
-        except requests.HTTPError as exc:
-            body = exc.response.text if exc.response is not None else ""
-            logger.warning("Azure LLM HTTPError (%s): %s", exc, body)
-            fallback = self._heuristic_framework(text, categories)
-            fallback.setdefault("raw_response", body)
-            return fallback
+            result["attempts"] = attempt
+            if not _framework_is_empty(result):
+                break
+        return result
+
+    def _framework_attempt(
+        self, text: str, categories: List[FrameworkCategory], attempt: int
+    ) -> Tuple[str, Dict[str, Any]]:
+        """``(prompt, request extras)`` for the given attempt; retries add a note and some sampling."""
 
-    def _build_framework_prompt(self, text: str, categories: List[FrameworkCategory]) -> str:
+        if attempt == 1:
+            return self._build_framework_prompt(text, categories), self._response_format()
+        prompt = self._build_framework_prompt(text, categories, retry_note=FRAMEWORK_RETRY_NOTE)
+        return prompt, {**self._response_format(), "temperature": FRAMEWORK_RETRY_TEMPERATURE}
+
+    def _build_framework_prompt(
+        self, text: str, categories: List[FrameworkCategory], retry_note: Optional[str] = None
+    ) -> str:
         framework = [
             {
                 "id": cat.id,
@@ -644,6 +1459,11 @@ class LLMClient:
             }
             for cat in categories
         ]
+        document = text if len(text) <= MAX_FRAMEWORK_DOCUMENT_CHARS else text[:MAX_FRAMEWORK_DOCUMENT_CHARS]
+        byte_budget = self.options.get("document_byte_budget")
+        if byte_budget:
+            # CJK text is ~3 bytes per char in UTF-8; budget what actually goes on the wire
+            document = _truncate_utf8(document, int(byte_budget))
 
         payload = {
             "task": "tender_overview",
@@ -657,13 +1477,25 @@ class LLMClient:
                 " 全部内容仅能依据 document，严禁杜撰。最终仅返回 JSON：{\"categories\":[...],\"timeline\":{...}}。"
             ),
             "framework": framework,
-            "document": text[:20000],
         }
-        return json.dumps(payload, ensure_ascii=False)
+        if retry_note:
+            payload["retry_note"] = retry_note
+        payload["document"] = document
+        return _dumps(payload)
 
-    def _parse_framework_response(self, content: str) -> Dict[str, Any]:
+    def _parse_framework_response(self, content: Any) -> Dict[str, Any]:
+        typed = _decode_framework_typed(content)
+        if typed is not None:
+            typed["raw_response"] = content
+            return typed
         try:
-            parsed = json.loads(content)
+            try:
+                parsed = _decode_content(content)
+            except ValueError:
+                # long answers are often cut off mid-timeline; keep the categories that did arrive
+                parsed = _salvage_framework(content)
+                if parsed is None:
+                    raise
             if not isinstance(parsed, dict):
                 return {"categories": [], "timeline": {"milestones": [], "remark": ""}, "raw_response": content}
             categories = parsed.get("categories") or []
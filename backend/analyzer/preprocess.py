@@ -4,35 +4,85 @@ from __future__ import annotations
 
 import re
 import unicodedata
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterator, Tuple
 
 _WHITESPACE_RE = re.compile(r"[\t\f\v]+")
 _MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
 _CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
 
 
-def preprocess_text(text: str) -> Tuple[str, Dict[str, Any]]:
-    """Return cleaned text and lightweight metadata."""
+# raw characters normalised per step; blocks are cut after a newline so "\r\n" never splits
+STREAM_BLOCK_CHARS = 1 << 16
 
-    original_length = len(text)
 
+def _clean_block(block: str) -> str:
     # Normalise unicode: convert full-width to half-width where sensible.
-    normalised = unicodedata.normalize("NFKC", text)
+    normalised = unicodedata.normalize("NFKC", block)
 
     # Standardise newlines and strip control chars.
     normalised = normalised.replace("\r\n", "\n").replace("\r", "\n")
     normalised = _CONTROL_RE.sub("", normalised)
 
-    # Collapse whitespace tabs/formfeeds to single spaces and condense blank lines.
-    normalised = _WHITESPACE_RE.sub(" ", normalised)
-    normalised = _MULTI_NEWLINE_RE.sub("\n\n", normalised)
+    # Collapse whitespace tabs/formfeeds to single spaces.
+    return _WHITESPACE_RE.sub(" ", normalised)
+
+
+def iter_preprocess(text: str, block_chars: int = STREAM_BLOCK_CHARS) -> Iterator[Tuple[str, int]]:
+    """Yield ``(chunk, raw_offset)`` pairs whose concatenation is the cleaned text.
 
-    cleaned = normalised.strip()
+    ``raw_offset`` is where the chunk's source block starts in ``text``. Trailing
+    whitespace of a block is held back until more content follows, so blank-line
+    condensing and stripping match cleaning the whole text at once.
+    """
 
-    metadata = {
+    pending = ""
+    started = False
+    start = 0
+    size = len(text)
+    while start < size:
+        end = min(start + block_chars, size)
+        if end < size:
+            cut = text.rfind("\n", start, end)
+            if cut < 0:
+                cut = text.find("\n", end)
+            end = size if cut < 0 else cut + 1
+        chunk = _MULTI_NEWLINE_RE.sub("\n\n", pending + _clean_block(text[start:end]))
+        if not started:
+            chunk = chunk.lstrip()
+        body = chunk.rstrip()
+        pending = chunk[len(body):]
+        if body:
+            started = True
+            yield body, start
+        start = end
+
+
+def preprocess_text(text: str) -> Tuple[str, Dict[str, Any]]:
+    """Return cleaned text and lightweight metadata."""
+
+    chunks = []
+    newlines = 0
+    for chunk, _ in iter_preprocess(text):
+        chunks.append(chunk)
+        newlines += chunk.count("\n")  # counted while the chunk is hot, not over the joined text
+    cleaned = "".join(chunks)
+    return cleaned, _metadata(len(text), len(cleaned), newlines)
+
+
+def preprocess_metadata(text: str) -> Dict[str, Any]:
+    """Metadata of :func:`preprocess_text` without materialising the cleaned text."""
+
+    clean_length = 0
+    newlines = 0
+    for chunk, _ in iter_preprocess(text):
+        clean_length += len(chunk)
+        newlines += chunk.count("\n")
+    return _metadata(len(text), clean_length, newlines)
+
+
+def _metadata(original_length: int, clean_length: int, newlines: int) -> Dict[str, Any]:
+    return {
         "original_length": original_length,
-        "clean_length": len(cleaned),
-        "line_count": cleaned.count("\n") + 1 if cleaned else 0,
+        "clean_length": clean_length,
+        "line_count": newlines + 1 if clean_length else 0,
     }
-    return cleaned, metadata
-
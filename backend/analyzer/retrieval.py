@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import math
+import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from difflib import SequenceMatcher
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 try:
     import numpy as np  # type: ignore
@@ -18,10 +19,17 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     SentenceTransformer = None  # type: ignore
 
+try:
+    import onnxruntime as ort  # type: ignore
+    from transformers import AutoTokenizer  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ort = None  # type: ignore
+    AutoTokenizer = None  # type: ignore
+
 _PARAGRAPH_RE = re.compile(r".+?(?:\n\s*\n|$)", re.S)
 
 
-@dataclass
+@dataclass(slots=True)
 class TextSegment:
     text: str
     start: int
@@ -71,13 +79,102 @@ class HeuristicRetriever:
         results.sort(key=lambda s: s.score, reverse=True)
         return results[: self.limit]
 
+    def locate_candidates_batch(self, text: str, hints_by_rule: Sequence[Iterable[str]]) -> List[List[TextSegment]]:
+        """``locate_candidates`` for several hint lists, splitting and lowering the text once."""
+
+        segments = split_text_into_segments(text, max_chars=self.max_chars)
+        lowered = [seg.text.lower() for seg in segments]
+        ratios: Dict[str, List[float]] = {}
+        batch: List[List[TextSegment]] = []
+        for hints in hints_by_rule:
+            hints_lower = [h.lower() for h in hints if h]
+            if not hints_lower:
+                batch.append([])
+                continue
+            for h in hints_lower:
+                if h not in ratios:
+                    # SequenceMatcher caches its analysis of the second sequence, so keep the hint there
+                    matcher = SequenceMatcher(b=h)
+                    row = []
+                    for seg_text in lowered:
+                        matcher.set_seq1(seg_text)
+                        row.append(matcher.ratio())
+                    ratios[h] = row
+            results = []
+            for idx, seg in enumerate(segments):
+                score = max(ratios[h][idx] for h in hints_lower)
+                if score >= self.threshold:
+                    results.append(replace(seg, score=score))
+            results.sort(key=lambda s: s.score, reverse=True)
+            batch.append(results[: self.limit])
+        return batch
+
+
+class OnnxEncoder:
+    """Mean-pooled sentence embeddings from an ONNX export of the model (e.g. int8-quantized).
+
+    Exposes the subset of ``SentenceTransformer.encode`` used by the retriever.
+    """
+
+    def __init__(self, onnx_path: str, tokenizer_name: str, max_length: int = 512) -> None:
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        self.input_names = {item.name for item in self.session.get_inputs()}
+        self.max_length = max_length
+
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> Any:
+        chunks = []
+        for offset in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[offset : offset + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feed = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            mask = encoded["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            chunks.append(pooled)
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
 
 class EmbeddingRetriever:
-    """Embedding-based retriever powered by sentence-transformers when available."""
+    """Embedding-based retriever powered by sentence-transformers when available.
 
-    def __init__(self, model_name: str = "shibing624/text2vec-base-chinese", limit: int = 6, max_chars: int = 600) -> None:
+    With ``onnx_path`` pointing at an ONNX export (see README) and ``onnxruntime`` +
+    ``transformers`` installed, the model runs through ONNX Runtime instead.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "shibing624/text2vec-base-chinese",
+        limit: int = 6,
+        max_chars: int = 600,
+        onnx_path: Optional[str] = None,
+    ) -> None:
         self.limit = limit
         self.max_chars = max_chars
+        self.model = None
+        if onnx_path and ort is not None and AutoTokenizer is not None and np is not None:
+            try:
+                self.model = OnnxEncoder(onnx_path, tokenizer_name=model_name)
+            except Exception:
+                self.model = None
+        if self.model is not None:
+            return
         if SentenceTransformer is None or np is None:
             self.model = None
         else:
@@ -108,6 +205,37 @@ class EmbeddingRetriever:
             results.append(seg)
         return results
 
+    def locate_candidates_batch(self, text: str, hints_by_rule: Sequence[Iterable[str]]) -> List[List[TextSegment]]:
+        """``locate_candidates`` for several hint lists with one encode of the segments and all hints."""
+
+        hint_lists = [list(hints) for hints in hints_by_rule]
+        if self.model is None or not any(hint_lists):
+            return [[] for _ in hint_lists]
+        segments = split_text_into_segments(text, max_chars=self.max_chars)
+        if not segments:
+            return [[] for _ in hint_lists]
+        unique_hints = list(dict.fromkeys(h for hints in hint_lists for h in hints))
+        column = {h: idx for idx, h in enumerate(unique_hints)}
+        try:
+            embeddings = self.model.encode(
+                [seg.text for seg in segments] + unique_hints,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+        except Exception:
+            return [[] for _ in hint_lists]
+        scores = embeddings[: len(segments)] @ embeddings[len(segments) :].T
+        batch: List[List[TextSegment]] = []
+        for hints in hint_lists:
+            if not hints:
+                batch.append([])
+                continue
+            best_scores = scores[:, [column[h] for h in hints]].max(axis=1)
+            ranked = sorted(zip(segments, best_scores), key=lambda item: float(item[1]), reverse=True)
+            batch.append([replace(seg, score=float(score)) for seg, score in ranked[: self.limit]])
+        return batch
+
 
 def merge_retrievals(*retrievers: Optional[Any]) -> Any:
     """Compose multiple retrievers into one callable."""
@@ -116,22 +244,40 @@ def merge_retrievals(*retrievers: Optional[Any]) -> Any:
     if not active:
         return None
 
+    def _merge(results: List[TextSegment]) -> List[TextSegment]:
+        # Deduplicate by start position and prefer higher score
+        dedup: Dict[int, TextSegment] = {}
+        for seg in results:
+            existing = dedup.get(seg.start)
+            if existing is None or seg.score > existing.score:
+                dedup[seg.start] = seg
+        return sorted(dedup.values(), key=lambda s: s.score, reverse=True)
+
     class CompositeRetriever:
         def locate_candidates(self, text: str, hints: Iterable[str]) -> List[TextSegment]:
+            hints = list(hints)
             results: List[TextSegment] = []
             for ret in active:
                 try:
                     results.extend(ret.locate_candidates(text, hints))
                 except Exception:
                     continue
-            # Deduplicate by start position and prefer higher score
-            dedup: Dict[int, TextSegment] = {}
-            for seg in results:
-                existing = dedup.get(seg.start)
-                if existing is None or seg.score > existing.score:
-                    dedup[seg.start] = seg
-            final = sorted(dedup.values(), key=lambda s: s.score, reverse=True)
-            return final
+            return _merge(results)
+
+        def locate_candidates_batch(self, text: str, hints_by_rule: Sequence[Iterable[str]]) -> List[List[TextSegment]]:
+            hint_lists = [list(hints) for hints in hints_by_rule]
+            merged: List[List[TextSegment]] = [[] for _ in hint_lists]
+            for ret in active:
+                try:
+                    if hasattr(ret, "locate_candidates_batch"):
+                        batch = ret.locate_candidates_batch(text, hint_lists)
+                    else:
+                        batch = [ret.locate_candidates(text, hints) for hints in hint_lists]
+                except Exception:
+                    continue
+                for results, found in zip(merged, batch):
+                    results.extend(found)
+            return [_merge(results) for results in merged]
 
     return CompositeRetriever()
 
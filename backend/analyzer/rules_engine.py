@@ -1,11 +1,141 @@
 from __future__ import annotations
 
+import os
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
 
+try:
+    import ahocorasick  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ahocorasick = None  # type: ignore
 
-@dataclass
+try:
+    import hyperscan  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    hyperscan = None  # type: ignore
+
+try:
+    from re import _parser as _sre_parse  # type: ignore
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse  # type: ignore
+
+# Python-only syntax that PCRE/Hyperscan would accept with a narrower meaning ("{,n}" is a
+# literal there, "[:" may start a POSIX class); such patterns always go straight to ``re``.
+_HS_UNSAFE = ("{,", "[:")
+
+# regex nodes Hyperscan matches exactly as ``re`` does (given caseless-neutral characters)
+_HS_EXACT_OPS = {
+    _sre_parse.LITERAL,
+    _sre_parse.ANY,
+    _sre_parse.IN,
+    _sre_parse.RANGE,
+    _sre_parse.BRANCH,
+    _sre_parse.SUBPATTERN,
+    _sre_parse.MAX_REPEAT,
+    _sre_parse.MIN_REPEAT,
+}
+
+
+def _hs_exact(pattern: str) -> bool:
+    """Whether Hyperscan reports exactly the matches ``re`` would for ``pattern``.
+
+    Limited to literals, classes, ``.``, groups, alternation and repeats over
+    characters without case (CJK, digits, punctuation): Unicode case folding is
+    where the two engines' caseless modes differ.
+    """
+
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE | re.MULTILINE)
+    except re.error:
+        return False
+    stack: List[Any] = [list(parsed)]
+    while stack:
+        for op, av in stack.pop():
+            if op not in _HS_EXACT_OPS:
+                return False
+            if op is _sre_parse.LITERAL:
+                char = chr(av)
+                if char.lower() != char or char.upper() != char:
+                    return False
+            elif op is _sre_parse.RANGE:
+                if any(chr(c).lower() != chr(c) or chr(c).upper() != chr(c) for c in range(av[0], av[1] + 1)):
+                    return False
+            elif op is _sre_parse.IN:
+                stack.append(av)
+            elif op is _sre_parse.BRANCH:
+                stack.extend(list(branch) for branch in av[1])
+            elif op is _sre_parse.SUBPATTERN:
+                if av[1] or av[2]:  # inline flags
+                    return False
+                stack.append(list(av[3]))
+            elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT):
+                stack.append(list(av[2]))
+    return True
+
+
+def _shardable(pattern: Pattern[str], reach: int) -> bool:
+    """Whether ``pattern`` finds the same matches in a shard as in the whole text.
+
+    A shard starts just after a line break and reads ``reach`` chars past its cut, so
+    matches must be non-empty and shorter than that, and must not look around them or
+    anchor to the start of the string.
+    """
+
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except re.error:
+        return False
+    low, high = parsed.getwidth()
+    if low == 0 or high >= reach:
+        return False
+    anchors = {_sre_parse.AT_BEGINNING_STRING}
+    if not pattern.flags & re.MULTILINE:
+        anchors.add(_sre_parse.AT_BEGINNING)
+    stack: List[Any] = [list(parsed)]
+    while stack:
+        for op, av in stack.pop():
+            if op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+                return False
+            if op is _sre_parse.AT and av in anchors:
+                return False
+            if op is _sre_parse.SUBPATTERN:
+                stack.append(list(av[3]))
+            elif op is _sre_parse.BRANCH:
+                stack.extend(list(branch) for branch in av[1])
+            elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT, getattr(_sre_parse, "POSSESSIVE_REPEAT", None)):
+                stack.append(list(av[2]))
+            elif op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+                stack.append(list(av))
+            elif op is _sre_parse.GROUPREF_EXISTS:
+                stack.extend(list(branch) for branch in av[1:] if branch is not None)
+    return True
+
+
+_PUNCT_RE = re.compile(r"[。．！？!?；;\n]")
+_LAST_PUNCT_RE = re.compile(r".*[。．！？!?；;\n]", re.DOTALL)
+
+# Hit attributes copied into each evidence payload, read as one tuple per hit
+_EVIDENCE_FIELDS = ("snippet", "evidence", "start", "length")
+_evidence_row = attrgetter(*_EVIDENCE_FIELDS)
+
+
+def _compile_patterns(patterns: List[str]) -> List[Pattern[str]]:
+    compiled: List[Pattern[str]] = []
+    for pat in patterns:
+        try:
+            compiled.append(re.compile(pat, re.IGNORECASE | re.MULTILINE))
+        except re.error:
+            # ignore invalid regex in template
+            continue
+    return compiled
+
+
+@dataclass(slots=True, frozen=True)
 class Rule:
     id: str
     category: str
@@ -14,9 +144,21 @@ class Rule:
     patterns: List[str]
     severity: str = "medium"  # low | medium | high | critical
     advice: Optional[str] = None
+    lower_patterns: List[str] = field(init=False, repr=False, compare=False)
+    compiled: List[Pattern[str]] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        # keyword matching is case-insensitive; lowercase the patterns once per rule
+        object.__setattr__(self, "lower_patterns", [p.lower() for p in self.patterns])
+        object.__setattr__(self, "compiled", _compile_patterns(self.patterns) if self.match_type == "regex" else [])
 
-@dataclass
+    def as_dict(self) -> Dict[str, Any]:
+        """The rule's declared fields, as passed to the LLM client."""
+
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+
+
+@dataclass(slots=True, frozen=True)
 class Hit:
     rule_id: str
     category: str
@@ -30,20 +172,154 @@ class Hit:
 
 
 class RulesEngine:
+    # Boilerplate keywords can occur thousands of times in one tender; nobody reads past the
+    # first few dozen, so matching stops there and keeps one hit per ~sentence-sized span.
+    MAX_HITS_PER_RULE = 50
+    HIT_SPAN = 200
+    # With an executor, texts longer than this are split at line breaks and scanned in
+    # parallel; each shard also reads SHARD_OVERLAP chars past its end for straddling matches.
+    # Patterns that may run further (see ``_shardable``) are scanned over the whole text.
+    SHARD_THRESHOLD = 1_000_000
+    SHARD_OVERLAP = 2000
+
     def __init__(self, rules: List[Rule], llm: Optional[Any] = None, retriever: Optional[Any] = None):
         self.rules = rules
         self.llm = llm
         self.retriever = retriever
+        self._keyword_automaton = self._build_keyword_automaton(rules)
+        self._regex_patterns = {idx: r.compiled for idx, r in enumerate(rules) if r.match_type == "regex"}
+        self._regex_prefilter = self._build_regex_prefilter(self._regex_patterns)
+        # (rule_idx, pattern_idx) a sharded scan must run over the whole text
+        reach = self.SHARD_OVERLAP // 2  # margin for ``$`` also matching before a final newline
+        self._unshardable: Set[Tuple[int, int]] = {
+            (rule_idx, pat_idx)
+            for rule_idx, rule in enumerate(rules)
+            if rule.match_type in ("keyword", "regex")
+            for pat_idx, pattern in enumerate(rule.lower_patterns if rule.match_type == "keyword" else rule.compiled)
+            if (not 0 < len(pattern) < reach if rule.match_type == "keyword" else not _shardable(pattern, reach))
+        }
+        self._shard_count: Optional[int] = None
+
+    @staticmethod
+    def _build_keyword_automaton(rules: List[Rule]) -> Any:
+        """One automaton over every keyword, valued ``[(rule_idx, kw_idx), ...]`` per lowered pattern."""
+
+        if ahocorasick is None:
+            return None
+        automaton = ahocorasick.Automaton()
+        for rule_idx, rule in enumerate(rules):
+            if rule.match_type != "keyword":
+                continue
+            for kw_idx, pattern in enumerate(rule.lower_patterns):
+                if not pattern:
+                    return None  # "" matches at every offset; leave such templates to the plain scan
+                if pattern in automaton:
+                    automaton.get(pattern)[1].append((rule_idx, kw_idx))
+                else:
+                    automaton.add_word(pattern, (pattern, [(rule_idx, kw_idx)]))
+        if not len(automaton):
+            return None
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _build_regex_prefilter(compiled: Dict[int, List[Pattern[str]]]) -> Any:
+        """Hyperscan database telling, in one scan, which compiled patterns can match at all.
+
+        Built in prefilter mode, which may report false positives but never misses a
+        pattern that matches; ``re`` still produces the actual hits. Patterns passing
+        :func:`_hs_exact` are compiled exactly instead, so ``re`` only runs on them when
+        they really match. Returns ``(database, ids -> (rule_idx, pattern_idx), always-run
+        keys)`` or ``None``.
+        """
+
+        if hyperscan is None or not compiled:
+            return None
+        flags = (
+            hyperscan.HS_FLAG_CASELESS
+            | hyperscan.HS_FLAG_MULTILINE
+            | hyperscan.HS_FLAG_UTF8
+            | hyperscan.HS_FLAG_UCP
+            | hyperscan.HS_FLAG_ALLOWEMPTY
+        )
+        exact_flags = flags | hyperscan.HS_FLAG_SINGLEMATCH
+        prefilter_flags = exact_flags | hyperscan.HS_FLAG_PREFILTER
+        keys: List[Tuple[int, int]] = []
+        expressions: List[bytes] = []
+        expression_flags: List[int] = []
+        always: Set[Tuple[int, int]] = set()
+        for rule_idx, patterns in compiled.items():
+            for pat_idx, pattern in enumerate(patterns):
+                key = (rule_idx, pat_idx)
+                if any(token in pattern.pattern for token in _HS_UNSAFE):
+                    always.add(key)
+                    continue
+                expression = pattern.pattern.encode("utf-8")
+                for candidate in ((exact_flags, prefilter_flags) if _hs_exact(pattern.pattern) else (prefilter_flags,)):
+                    try:
+                        hyperscan.Database().compile(expressions=[expression], ids=[0], flags=[candidate])
+                    except Exception:
+                        continue
+                    keys.append(key)
+                    expressions.append(expression)
+                    expression_flags.append(candidate)
+                    break
+                else:
+                    always.add(key)  # syntax Hyperscan cannot handle even approximately
+        if not expressions:
+            return None
+        database = hyperscan.Database()
+        database.compile(expressions=expressions, ids=list(range(len(expressions))), flags=expression_flags)
+        return database, keys, always
+
+    def _prefilter_regex(self, text: str) -> Dict[int, List[Pattern[str]]]:
+        """Restrict ``_regex_patterns`` to the patterns the Hyperscan pass says may match ``text``."""
+
+        database, keys, always = self._regex_prefilter
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:  # lone surrogates: let ``re`` handle the full set
+            return self._regex_patterns
+        matched: Set[Tuple[int, int]] = set(always)
 
-    def analyze(self, text: str) -> Dict[str, Any]:
+        def on_match(expr_id: int, start: int, end: int, flags: int, context: Any) -> None:
+            matched.add(keys[expr_id])
+
+        # scratch space is per scan so engines can be shared between threads
+        database.scan(data, match_event_handler=on_match, scratch=hyperscan.Scratch(database))
+        return {
+            rule_idx: [pattern for pat_idx, pattern in enumerate(patterns) if (rule_idx, pat_idx) in matched]
+            for rule_idx, patterns in self._regex_patterns.items()
+        }
+
+    def create_executor(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """Process pool whose workers each hold a copy of this engine's rules (LLM/retriever excluded).
+
+        Pass it to :meth:`analyze` to run the keyword/regex scan outside the GIL of the
+        calling process; on Linux the workers are forked, so the rules are shared copy-on-write.
+        """
+
+        self._shard_count = max_workers or os.cpu_count() or 1
+        return ProcessPoolExecutor(
+            max_workers=self._shard_count,
+            initializer=_init_worker,
+            initargs=(self.rules,),
+        )
+
+    def analyze(self, text: str, executor: Optional[Executor] = None) -> Dict[str, Any]:
+        if executor is None:
+            lexical = self.match_lexical(text)
+        elif len(text) > self.SHARD_THRESHOLD:
+            lexical = self._match_lexical_sharded(text, executor)
+        else:
+            lexical = executor.submit(_match_in_worker, text).result()
         hits: List[Hit] = []
-        for r in self.rules:
-            if r.match_type == "keyword":
-                hits.extend(self._match_keyword(r, text))
-            elif r.match_type == "regex":
-                hits.extend(self._match_regex(r, text))
-            elif r.match_type == "semantic":
-                hits.extend(self._match_semantic(r, text))
+        located = self._locate_all(text)  # retriever results per hint set, for this text only
+        for idx, r in enumerate(self.rules):
+            if r.match_type == "semantic":
+                hits.extend(self._match_semantic(r, text, located))
+            else:
+                hits.extend(lexical.get(idx, ()))
 
         aggregated = self._aggregate_hits(hits)
 
@@ -54,20 +330,227 @@ class RulesEngine:
             "categories": aggregated,
         }
 
-    def _match_keyword(self, rule: Rule, text: str) -> List[Hit]:
-        hits: List[Hit] = []
-        lower_text = text.lower()
-        for kw in rule.patterns:
-            pattern = kw.lower()
-            idx = lower_text.find(pattern)
-            while idx >= 0:
-                snippet = self._context(text, idx, len(kw))
-                hits.append(
+    def match_lexical(self, text: str) -> Dict[int, List[Hit]]:
+        """Keyword and regex hits keyed by rule index; pure CPU work, safe to run in a worker."""
+
+        lexical: Dict[int, List[Hit]] = {}
+        lower_text = text.lower() if any(r.match_type == "keyword" for r in self.rules) else ""
+        keyword_hits = self._match_all_keywords(text, lower_text) if self._keyword_automaton is not None else None
+        regex_patterns = self._regex_patterns
+        if self._regex_prefilter is not None:
+            regex_patterns = self._prefilter_regex(text)
+        for idx, r in enumerate(self.rules):
+            if r.match_type == "keyword":
+                if keyword_hits is not None:
+                    lexical[idx] = keyword_hits.get(idx, [])
+                else:
+                    lexical[idx] = self._match_keyword(r, text, lower_text)
+            elif r.match_type == "regex":
+                lexical[idx] = self._match_regex(r, text, regex_patterns.get(idx))
+        return lexical
+
+    def scan_shard(
+        self, shard: str, base_offset: int, owned: int, whole: bool = False
+    ) -> Tuple[Dict[Tuple[int, int], List[Tuple[int, int]]], Dict[Tuple[int, int], Optional[int]]]:
+        """Raw ``(start, end)`` matches per ``(rule_idx, pattern_idx)`` starting in ``shard[:owned]``.
+
+        Offsets are shifted by ``base_offset``. Only the candidates the caps in
+        ``_hits_from_matches`` can still reach are kept, so workers return little data.
+        The second mapping lists patterns whose last match runs past the cut (where the
+        whole-text scan resumes) or that hit the cap (``None``); the next shard is out of
+        step for those. ``whole`` scans just the patterns that cannot be sharded.
+        """
+
+        found: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        overruns: Dict[Tuple[int, int], Optional[int]] = {}
+        unshardable = self._unshardable
+        lower_shard = shard.lower() if any(r.match_type == "keyword" for r in self.rules) else ""
+        regex_patterns = self._regex_patterns
+        if self._regex_prefilter is not None:
+            regex_patterns = self._prefilter_regex(shard)
+        candidates = {id(pattern) for patterns in regex_patterns.values() for pattern in patterns}
+        for key in self._lexical_keys():
+            if (key in unshardable) != whole:
+                continue
+            rule_idx, pat_idx = key
+            if self.rules[rule_idx].match_type == "regex":
+                pattern = self._regex_patterns[rule_idx][pat_idx]
+                if id(pattern) not in candidates:
+                    continue
+            matches, resume = self._scan_pattern(key, shard, lower_shard, 0, owned, base_offset)
+            if matches:
+                found[key] = [(base_offset + start, base_offset + end) for start, end in matches]
+            if resume is None or resume > owned:
+                overruns[key] = None if resume is None else base_offset + resume
+        return found, overruns
+
+    def _lexical_keys(self) -> List[Tuple[int, int]]:
+        return [
+            (rule_idx, pat_idx)
+            for rule_idx, rule in enumerate(self.rules)
+            if rule.match_type in ("keyword", "regex")
+            for pat_idx in range(len(rule.patterns) if rule.match_type == "keyword" else len(rule.compiled))
+        ]
+
+    def _scan_pattern(
+        self, key: Tuple[int, int], text: str, lower_text: str, begin: int, owned: int, base_offset: int = 0
+    ) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+        """Matches of one pattern starting in ``text[begin:owned]``, as the whole-text scan finds them.
+
+        Also returns where that scan resumes after the last of them (``None`` once the cap
+        is reached, after which later matches cannot change the hits).
+        """
+
+        limit = 2 * self.MAX_HITS_PER_RULE  # also covers spans dropped when shards merge
+        rule_idx, pat_idx = key
+        rule = self.rules[rule_idx]
+        matches: List[Tuple[int, int]] = []
+        resume = begin
+        if rule.match_type == "keyword":
+            # like _match_keyword: non-overlapping occurrences, first one per span
+            pattern, length = rule.lower_patterns[pat_idx], len(rule.patterns[pat_idx])
+            spans: Set[int] = set()
+            idx = lower_text.find(pattern, begin)
+            while 0 <= idx < owned:
+                if len(matches) >= limit:
+                    return matches, None
+                span = (base_offset + idx) // self.HIT_SPAN  # spans are positions in the whole text
+                if span not in spans:
+                    spans.add(span)
+                    matches.append((idx, idx + length))
+                resume = idx + (len(pattern) or 1)
+                idx = lower_text.find(pattern, resume)
+            return matches, resume
+        for m in self._regex_patterns[rule_idx][pat_idx].finditer(text, begin):
+            if m.start() >= owned:
+                break
+            if len(matches) >= limit:
+                return matches, None
+            matches.append((m.start(), m.end()))
+            resume = m.end()
+        return matches, resume
+
+    def _shard_bounds(self, text: str, parts: int) -> List[Tuple[int, int]]:
+        """``(start, stop)`` pairs covering ``text``, each cut just after a line break."""
+
+        bounds: List[Tuple[int, int]] = []
+        size = max(1, len(text) // max(1, parts))
+        start = 0
+        while start < len(text):
+            cut = text.find("\n", start + size)
+            stop = len(text) if cut < 0 else cut + 1
+            bounds.append((start, stop))
+            start = stop
+        return bounds
+
+    def _match_lexical_sharded(self, text: str, executor: Executor) -> Dict[int, List[Hit]]:
+        bounds = self._shard_bounds(text, self._shard_count or os.cpu_count() or 1)
+        futures = [
+            executor.submit(_scan_in_worker, text[start : stop + self.SHARD_OVERLAP], start, stop - start)
+            for start, stop in bounds
+        ]
+        whole = None
+        if self._unshardable:  # owns offset len(text) too: patterns matching "" also match at the very end
+            whole = executor.submit(_scan_in_worker, text, 0, len(text) + 1, True)
+
+        merged: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # patterns whose previous shard ended past the cut: where the whole-text scan resumes
+        # (``None``: capped), so this shard's own scan of them started out of step
+        behind: Dict[Tuple[int, int], Optional[int]] = {}
+        lower_text: Optional[str] = None
+        for (start, stop), future in zip(bounds, futures):
+            found, overruns = future.result()
+            for key, matches in found.items():
+                if key not in behind:
+                    merged.setdefault(key, []).extend(matches)
+            resumed: Dict[Tuple[int, int], Optional[int]] = {}
+            for key, resume in behind.items():
+                if resume is None or resume >= stop:
+                    resumed[key] = resume
+                    continue
+                # rare (a match across the line break at the cut): redo this shard for the pattern
+                if lower_text is None:
+                    lower_text = text.lower() if any(r.match_type == "keyword" for r in self.rules) else ""
+                matches, resume = self._scan_pattern(key, text, lower_text, resume, stop)
+                merged.setdefault(key, []).extend(matches)
+                if resume is None or resume > stop:
+                    resumed[key] = resume
+            for key, resume in overruns.items():
+                if key not in behind:
+                    resumed[key] = resume
+            behind = resumed
+        if whole is not None:
+            merged.update(whole.result()[0])
+        return self._hits_from_matches(text, merged)
+
+    def _hits_from_matches(
+        self, text: str, matches: Dict[Tuple[int, int], List[Tuple[int, int]]]
+    ) -> Dict[int, List[Hit]]:
+        """Apply the per-rule span dedupe and cap to merged matches, as the in-process scan does."""
+
+        lexical: Dict[int, List[Hit]] = {}
+        for rule_idx, rule in enumerate(self.rules):
+            if rule.match_type not in ("keyword", "regex"):
+                continue
+            hits: List[Hit] = []
+            spans: Set[int] = set()
+            count = len(rule.patterns) if rule.match_type == "keyword" else len(rule.compiled)
+            for pat_idx in range(count):
+                for start, end in matches.get((rule_idx, pat_idx), ()):
+                    if len(hits) >= self.MAX_HITS_PER_RULE:
+                        break
+                    if rule.match_type == "keyword":
+                        if start // self.HIT_SPAN in spans:
+                            continue
+                        spans.add(start // self.HIT_SPAN)
+                    hits.append(
+                        Hit(
+                            rule_id=rule.id,
+                            category=rule.category,
+                            severity=rule.severity,
+                            snippet=self._context(text, start, end - start),
+                            evidence=text[start:end],
+                            description=rule.description,
+                            start=start,
+                            length=end - start,
+                            advice=rule.advice,
+                        )
+                    )
+            lexical[rule_idx] = hits
+        return lexical
+
+    def _match_all_keywords(self, text: str, lower_text: str) -> Dict[int, List[Hit]]:
+        """Keyword hits for every rule from a single automaton pass, in ``_match_keyword`` order."""
+
+        starts: Dict[Tuple[int, int], List[int]] = {}
+        for end, (pattern, entries) in self._keyword_automaton.iter(lower_text):
+            length = len(pattern)
+            start = end - length + 1
+            for key in entries:
+                found = starts.setdefault(key, [])
+                # like repeated str.find, a keyword's occurrences never overlap each other
+                if not found or start >= found[-1] + length:
+                    found.append(start)
+
+        by_rule: Dict[int, List[Hit]] = {}
+        seen: Dict[int, Set[int]] = {}
+        for (rule_idx, kw_idx) in sorted(starts):
+            rule = self.rules[rule_idx]
+            kw = rule.patterns[kw_idx]
+            bucket = by_rule.setdefault(rule_idx, [])
+            spans = seen.setdefault(rule_idx, set())
+            for idx in starts[(rule_idx, kw_idx)]:
+                if len(bucket) >= self.MAX_HITS_PER_RULE:
+                    break
+                if idx // self.HIT_SPAN in spans:
+                    continue
+                spans.add(idx // self.HIT_SPAN)
+                bucket.append(
                     Hit(
                         rule_id=rule.id,
                         category=rule.category,
                         severity=rule.severity,
-                        snippet=snippet,
+                        snippet=self._context(text, idx, len(kw)),
                         evidence=text[idx : idx + len(kw)],
                         description=rule.description,
                         start=idx,
@@ -75,73 +558,137 @@ class RulesEngine:
                         advice=rule.advice,
                     )
                 )
-                idx = lower_text.find(pattern, idx + len(pattern) if len(pattern) else idx + 1)
-        return hits
+        return by_rule
 
-    def _match_regex(self, rule: Rule, text: str) -> List[Hit]:
+    def _match_keyword(self, rule: Rule, text: str, lower_text: Optional[str] = None) -> List[Hit]:
         hits: List[Hit] = []
-        for pat in rule.patterns:
-            try:
-                for m in re.finditer(pat, text, flags=re.IGNORECASE | re.MULTILINE):
-                    snippet = self._context(text, m.start(), m.end() - m.start())
+        if lower_text is None:
+            lower_text = text.lower()
+        spans: Set[int] = set()
+        for kw, pattern in zip(rule.patterns, rule.lower_patterns):
+            idx = lower_text.find(pattern)
+            while idx >= 0 and len(hits) < self.MAX_HITS_PER_RULE:
+                if idx // self.HIT_SPAN not in spans:
+                    spans.add(idx // self.HIT_SPAN)
                     hits.append(
                         Hit(
                             rule_id=rule.id,
                             category=rule.category,
                             severity=rule.severity,
-                            snippet=snippet,
-                            evidence=m.group(0),
+                            snippet=self._context(text, idx, len(kw)),
+                            evidence=text[idx : idx + len(kw)],
                             description=rule.description,
-                            start=m.start(),
-                            length=m.end() - m.start(),
+                            start=idx,
+                            length=len(kw),
                             advice=rule.advice,
                         )
                     )
-            except re.error:
-                # ignore invalid regex in template
-                continue
+                idx = lower_text.find(pattern, idx + len(pattern) if len(pattern) else idx + 1)
         return hits
 
-    def _match_semantic(self, rule: Rule, text: str) -> List[Hit]:
+    def _match_regex(self, rule: Rule, text: str, patterns: Optional[List[Pattern[str]]] = None) -> List[Hit]:
         hits: List[Hit] = []
-        segments = None
-        if self.retriever:
-            try:
-                segments = self.retriever.locate_candidates(text, hints=rule.patterns)
-            except Exception:
-                segments = None
-        if not self.llm and segments:
-            candidates = [
-                {"start": seg.start, "length": seg.length, "evidence": seg.text, "score": getattr(seg, "score", 0.0)}
-                for seg in segments
-            ]
-        elif not self.llm:
-            return hits
-        else:
-            candidates = self.llm.semantic_locate(text=text, hints=rule.patterns, rule=rule.__dict__, segments=segments)
-        try:
-            for c in candidates or []:
-                idx = max(0, c.get("start", 0))
-                length = max(0, c.get("length", 0))
-                snippet = self._context(text, idx, length)
-                evidence = c.get("evidence", snippet)
+        if patterns is None:
+            patterns = rule.compiled
+        for pattern in patterns:
+            for m in islice(pattern.finditer(text), self.MAX_HITS_PER_RULE - len(hits)):
+                snippet = self._context(text, m.start(), m.end() - m.start())
                 hits.append(
                     Hit(
                         rule_id=rule.id,
                         category=rule.category,
                         severity=rule.severity,
                         snippet=snippet,
-                        evidence=evidence,
+                        evidence=m.group(0),
                         description=rule.description,
-                        start=idx,
-                        length=length,
+                        start=m.start(),
+                        length=m.end() - m.start(),
                         advice=rule.advice,
                     )
                 )
-        except Exception:
-            pass
         return hits
 
+    def _match_semantic(
+        self, rule: Rule, text: str, located: Optional[Dict[Tuple[str, ...], Any]] = None
+    ) -> List[Hit]:
+        hits: List[Hit] = []
+        if not self.llm and not self.retriever:
+            return hits
+        segments = None
+        if self.retriever:
+            # also on long texts: without candidates ``semantic_locate`` only sees the document head
+            segments = self._locate_candidates(text, rule.patterns, located)
+        if not self.llm and segments:
+            # retrievers yield ``TextSegment``s, which always carry a score
+            candidates = [
+                {"start": seg.start, "length": seg.length, "evidence": seg.text, "score": seg.score}
+                for seg in segments
+            ]
+        elif not self.llm:
+            return hits
+        else:
+            candidates = self.llm.semantic_locate(text=text, hints=rule.patterns, rule=rule.as_dict(), segments=segments)
+        context = self._context
+        rule_id, category, severity = rule.id, rule.category, rule.severity
+        description, advice = rule.description, rule.advice
+        for c in candidates or []:
+            try:
+                idx = max(0, int(c["start"]))
+                length = max(0, int(c["length"]))
+            except (KeyError, TypeError, ValueError):
+                continue  # one malformed candidate must not drop the others
+            hits.append(
+                Hit(
+                    rule_id=rule_id,
+                    category=category,
+                    severity=severity,
+                    snippet=context(text, idx, length),
+                    evidence=c.get("evidence", ""),
+                    description=description,
+                    start=idx,
+                    length=length,
+                    advice=advice,
+                )
+            )
+        return hits
+
+    def _locate_all(self, text: str) -> Dict[Tuple[str, ...], Any]:
+        """Batch the retriever over every semantic rule's hints when it supports it.
+
+        The document is split and encoded once for all rules, which keeps retrieval
+        affordable on long tenders.
+        """
+
+        if not self.retriever or not hasattr(self.retriever, "locate_candidates_batch"):
+            return {}
+        keys = list(dict.fromkeys(tuple(r.patterns) for r in self.rules if r.match_type == "semantic"))
+        if not keys:
+            return {}
+        try:
+            batch = self.retriever.locate_candidates_batch(text, [list(key) for key in keys])
+        except Exception:
+            return {}  # fall back to one lookup per hint set
+        return {key: list(found) for key, found in zip(keys, batch)}
+
+    def _locate_candidates(
+        self, text: str, hints: List[str], located: Optional[Dict[Tuple[str, ...], Any]]
+    ) -> Optional[List[Any]]:
+        """Retriever candidates for ``hints``; rules sharing a hint set reuse one lookup."""
+
+        key = tuple(hints)
+        if located is not None and key in located:
+            cached = located[key]
+            return list(cached) if cached is not None else None
+        try:
+            segments = self.retriever.locate_candidates(text, hints=hints)
+        except Exception:
+            segments = None
+        if segments is not None:
+            segments = list(segments)
+        if located is not None:
+            located[key] = segments
+        return list(segments) if segments is not None else None
+
     @staticmethod
     def _context(text: str, start: int, length: int, window: int = 120) -> str:
         if not text:
@@ -150,53 +697,43 @@ class RulesEngine:
         s = max(0, start - window)
         e = min(len(text), start + length + window)
 
-        # try to expand to sentence boundaries using common punctuation
-        punct = "。．！？!?；;\n"
-        left = start
-        while left > 0 and text[left - 1] not in punct:
-            left -= 1
-            if left <= s:
-                break
+        # expand to sentence boundaries using common punctuation: just after the last
+        # one before the hit, through the first one after it, within the window
+        m = _LAST_PUNCT_RE.match(text, s, start)
+        left = m.end() if m else s
+        m = _PUNCT_RE.search(text, start + length, e)
+        right = m.end() if m else e
 
-        right = start + length
-        while right < len(text) and text[right] not in punct:
-            right += 1
-            if right >= e:
-                break
-
-        snippet = text[max(left, s):min(right + 1, e)].strip()
+        snippet = text[left:right].strip()
         if not snippet:
             snippet = text[s:e].strip()
         return snippet
 
     def _aggregate_hits(self, hits: List[Hit]) -> Dict[str, List[Dict[str, Any]]]:
-        grouped: Dict[str, Dict[str, Any]] = {}
+        # group the Hit objects first; payload dicts are built per group in one comprehension
+        grouped: Dict[Tuple[str, str], List[Hit]] = defaultdict(list)
+        appenders: Dict[Tuple[str, str], Any] = {}  # bound ``list.append`` per group
         for hit in hits:
-            key = f"{hit.category}::{hit.rule_id}"
-            bucket = grouped.get(key)
-            evidence_payload = {
-                "snippet": hit.snippet,
-                "evidence": hit.evidence,
-                "start": hit.start,
-                "length": hit.length,
-            }
-            if not bucket:
-                bucket = {
-                    "rule_id": hit.rule_id,
-                    "description": hit.description,
-                    "severity": hit.severity,
-                    "advice": hit.advice,
-                    "category": hit.category,
-                    "evidences": [evidence_payload],
-                }
-                grouped[key] = bucket
-            else:
-                bucket["evidences"].append(evidence_payload)
+            key = (hit.category, hit.rule_id)
+            append = appenders.get(key)
+            if append is None:
+                append = appenders[key] = grouped[key].append
+            append(hit)
 
-        categories: Dict[str, List[Dict[str, Any]]] = {}
+        # only four severities, so order each category with a stable bucket pass instead of a sort
         weight = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+        by_severity: Dict[str, List[List[Dict[str, Any]]]] = defaultdict(lambda: [[], [], [], [], []])
 
-        for bucket in grouped.values():
+        for group in grouped.values():
+            first = group[0]
+            bucket = {
+                "rule_id": first.rule_id,
+                "description": first.description,
+                "severity": first.severity,
+                "advice": first.advice,
+                "category": first.category,
+                "evidences": [dict(zip(_EVIDENCE_FIELDS, row)) for row in map(_evidence_row, group)],
+            }
             summary = self._summarize_bucket(bucket)
             entry = {
                 "rule_id": bucket["rule_id"],
@@ -207,12 +744,9 @@ class RulesEngine:
                 "evidences": bucket["evidences"],
                 "advice": bucket.get("advice"),
             }
-            categories.setdefault(bucket["category"], []).append(entry)
+            by_severity[bucket["category"]][weight.get(entry["severity"], 2)].append(entry)
 
-        for cat in categories:
-            categories[cat].sort(key=lambda x: -weight.get(x.get("severity", "medium"), 2))
-
-        return categories
+        return {cat: slots[4] + slots[3] + slots[2] + slots[1] for cat, slots in by_severity.items()}
 
     def _summarize_bucket(self, bucket: Dict[str, Any]) -> Dict[str, Any]:
         evidences = bucket.get("evidences", [])
@@ -248,3 +782,24 @@ class RulesEngine:
                 if len(fallback_items) >= 5:
                     break
             return {"summary": bucket.get("description"), "items": fallback_items}
+
+
+# Engine built once per worker process by ``RulesEngine.create_executor``.
+_WORKER_ENGINE: Optional[RulesEngine] = None
+
+
+def _init_worker(rules: List[Rule]) -> None:
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = RulesEngine(rules)
+
+
+def _match_in_worker(text: str) -> Dict[int, List[Hit]]:
+    assert _WORKER_ENGINE is not None, "worker not initialised"
+    return _WORKER_ENGINE.match_lexical(text)
+
+
+def _scan_in_worker(
+    shard: str, base_offset: int, owned: int, whole: bool = False
+) -> Tuple[Dict[Tuple[int, int], List[Tuple[int, int]]], Dict[Tuple[int, int], Optional[int]]]:
+    assert _WORKER_ENGINE is not None, "worker not initialised"
+    return _WORKER_ENGINE.scan_shard(shard, base_offset, owned, whole)
@@ -4,7 +4,7 @@ from typing import Any, Dict, List
 
 from .framework import DEFAULT_FRAMEWORK, FrameworkCategory
 from .llm import LLMClient
-from .preprocess import preprocess_text
+from .preprocess import preprocess_metadata
 
 
 SEVERITY_WEIGHT = {"critical": 4, "high": 3, "medium": 2, "low": 1}
@@ -23,7 +23,7 @@ class TenderLLMAnalyzer:
         self.category_index = {cat.id: cat for cat in self.categories}
 
     def analyze(self, text: str) -> Dict[str, Any]:
-        _, preprocess_meta = preprocess_text(text)
+        preprocess_meta = preprocess_metadata(text)
         llm_result = self.llm.analyze_adaptive(text)
 
         return {
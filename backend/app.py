@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import io
 import json
 import os
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Callable, Dict, List, Optional
 
 try:
     from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Query, UploadFile
-    from fastapi.responses import FileResponse, JSONResponse
+    from fastapi.responses import FileResponse, JSONResponse, Response
     from fastapi.staticfiles import StaticFiles
 except Exception:
     # Allow reading code without FastAPI installed
@@ -16,34 +19,93 @@ except Exception:
     File = lambda *args, **kwargs: None  # type: ignore
     HTTPException = Exception  # type: ignore
     JSONResponse = dict  # type: ignore
+    Response = object  # type: ignore
     BackgroundTasks = object  # type: ignore
     Query = lambda *args, **kwargs: None  # type: ignore
     StaticFiles = object  # type: ignore
     FileResponse = dict  # type: ignore
 
 from .models import AnalyzeRequest
-from .analyzer.llm import LLMClient
-from .analyzer.framework import DEFAULT_FRAMEWORK
-from .analyzer.tender_llm import TenderLLMAnalyzer
 from .config import AppConfig, load_config
-from .services.analyzer_service import AnalysisService, background_runner
+from .services.analyzer_service import AnalysisService, background_runner, build_service, task_group_runner
+from .services.tasks import UPLOAD_DIR, celery_app, celery_runner, job_store
 
 try:
     import yaml
 except Exception:
     yaml = None
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+if orjson is not None and Response is not object:
+
+    class ORJSONResponse(Response):  # type: ignore[misc, valid-type]
+        """JSON response encoded with orjson; analysis payloads are large nested dicts."""
+
+        media_type = "application/json"
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+else:
+    ORJSONResponse = JSONResponse  # type: ignore
+
+
+class LazyService:
+    """Build the analysis service on first use so start-up and ``/config`` skip the LLM client."""
+
+    def __init__(self, factory: Callable[[], AnalysisService]) -> None:
+        self._factory = factory
+        self._service: Optional[AnalysisService] = None
+        self._lock = threading.Lock()
+
+    @property
+    def service(self) -> AnalysisService:
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = self._factory()
+        return self._service
+
+
+def _build_service(config: AppConfig) -> AnalysisService:
+    if celery_app is not None:
+        # jobs run in Celery workers; share their Redis store and upload volume
+        return build_service(config, store=job_store(), upload_dir=UPLOAD_DIR)
+    return build_service(config)
+
 
 def create_app(rules_path: str = None, config_path: str = None):  # type: ignore
     config = load_config(config_path)
-    llm = LLMClient(**config.llm.as_kwargs())
-    analyzer = TenderLLMAnalyzer(llm, categories=DEFAULT_FRAMEWORK)
-    service = AnalysisService(analyzer)
 
     if FastAPI is object:
         return None  # FastAPI not installed; return sentinel
 
-    app = FastAPI(title="投标助手 API", version="0.1.0")
+    lazy = LazyService(lambda: _build_service(config))
+    queued = celery_app is not None
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # async_mode jobs run as tasks of this group; shutdown waits for the ones in flight
+        async with asyncio.TaskGroup() as task_group:
+            app.state.task_group = task_group
+            yield
+            app.state.task_group = None
+
+    app = FastAPI(
+        title="投标助手 API", version="0.1.0", default_response_class=ORJSONResponse, lifespan=lifespan
+    )
+
+    def local_runner(background_tasks: BackgroundTasks):
+        task_group = getattr(app.state, "task_group", None)
+        if task_group is not None:
+            return task_group_runner(task_group)
+        # served without lifespan events: fall back to Starlette's background tasks
+        return lambda func, *args, **kwargs: background_runner(background_tasks, func, *args, **kwargs)
 
     web_dir = os.path.join(os.path.dirname(__file__), "..", "frontend", "web")
     web_dir = os.path.abspath(web_dir)
@@ -82,17 +144,19 @@ def create_app(rules_path: str = None, config_path: str = None):  # type: ignore
             raise HTTPException(status_code=400, detail="text 不能为空")
 
         async_runner = None
-        if getattr(req, "async_mode", False):
-            async_runner = lambda func, *args, **kwargs: background_runner(background_tasks, func, *args, **kwargs)
+        if queued:
+            async_runner = celery_runner
+        elif getattr(req, "async_mode", False):
+            async_runner = local_runner(background_tasks)
 
-        job = service.submit_text(
+        job = lazy.service.submit_text(
             text=text,
             filename=req.filename,
             metadata=req.metadata,
             async_runner=async_runner,
         )
-        include_result = not getattr(req, "async_mode", False)
-        return JSONResponse(service.serialize_job(job.job_id, include_result=include_result))
+        include_result = not (queued or getattr(req, "async_mode", False))
+        return ORJSONResponse(lazy.service.serialize_job(job.job_id, include_result=include_result))
 
     @app.post("/analyze/file")
     async def analyze_file(
@@ -106,27 +170,34 @@ def create_app(rules_path: str = None, config_path: str = None):  # type: ignore
 
         file_name = filename or getattr(file, "filename", None)
         content_type = getattr(file, "content_type", None)
-        file_bytes = await file.read()
-        buffer = io.BytesIO(file_bytes)
+        # Starlette has already spooled the upload (to disk past 1 MB); hand that file over
+        # instead of reading it into memory and copying it into a BytesIO
+        buffer = getattr(file, "file", None)
+        if buffer is None:
+            buffer = io.BytesIO(await file.read())
+        else:
+            await file.seek(0)
         metadata = {"content_type": content_type} if content_type else {}
 
         async_runner = None
-        if async_mode:
-            async_runner = lambda func, *args, **kwargs: background_runner(background_tasks, func, *args, **kwargs)
+        if queued:
+            async_runner = celery_runner
+        elif async_mode:
+            async_runner = local_runner(background_tasks)
 
-        job = service.submit_file(
+        job = lazy.service.submit_file(
             buffer,
             filename=file_name,
             content_type=content_type,
             metadata=metadata,
             async_runner=async_runner,
         )
-        return JSONResponse(service.serialize_job(job.job_id, include_result=not async_mode))
+        return ORJSONResponse(lazy.service.serialize_job(job.job_id, include_result=not (queued or async_mode)))
 
     @app.get("/jobs/{job_id}")
     def get_job(job_id: str):
         try:
-            return JSONResponse(service.serialize_job(job_id))
+            return ORJSONResponse(lazy.service.serialize_job(job_id))
         except KeyError:
             raise HTTPException(status_code=404, detail="job 不存在")
 
@@ -138,18 +209,18 @@ def create_app(rules_path: str = None, config_path: str = None):  # type: ignore
         window: int = Query(120, ge=0, le=2000, description="上下文窗口大小"),
     ):
         try:
-            payload = service.get_source_snippet(job_id, start=start, end=end, window=window)
+            payload = lazy.service.get_source_snippet(job_id, start=start, end=end, window=window)
         except KeyError:
             raise HTTPException(status_code=404, detail="job 不存在或未保留原文")
-        return JSONResponse(payload)
+        return ORJSONResponse(payload)
 
     @app.get("/jobs")
     def list_jobs():
-        return JSONResponse(service.list_jobs())
+        return ORJSONResponse(lazy.service.list_jobs())
 
     @app.delete("/jobs/{job_id}")
     def delete_job(job_id: str):
-        removed = service.delete_job(job_id)
+        removed = lazy.service.delete_job(job_id)
         if not removed:
             raise HTTPException(status_code=404, detail="job 不存在")
         return {"ok": True}
@@ -3,6 +3,8 @@
 import os
 import sys
 import json
+import pickle
+import tempfile
 
 CUR = os.path.dirname(__file__)
 ROOT = os.path.dirname(CUR)
@@ -20,10 +22,53 @@ try:
 except Exception:
     yaml = None
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+# bump whenever Rule (or how _parse_rules builds it) changes, so old pickles are re-parsed
+RULES_CACHE_VERSION = 1
+
 
 def load_rules(path: str):
+    # parsed rules (patterns already compiled) are pickled next to the source and reused
+    # while the source is not newer than the cache and the cache version matches
+    cache_path = path + ".cache.pkl"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            with open(cache_path, "rb") as f:
+                version, cached = pickle.load(f)
+            if version == RULES_CACHE_VERSION and all(isinstance(rule, Rule) for rule in cached):
+                return cached
+    except Exception:
+        pass
+    rules = _parse_rules(path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".tmp")
+    except OSError:
+        return rules  # read-only checkout: parse on every start
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((RULES_CACHE_VERSION, rules), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+    return rules
+
+
+def _parse_rules(path: str):
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) if path.endswith(".yaml") and yaml else json.load(f)
+        if path.endswith(".yaml") and yaml:
+            data = yaml.safe_load(f)
+        elif orjson is not None:
+            data = orjson.loads(f.read())
+        else:
+            data = json.load(f)
     rules = [
         Rule(
             id=i["id"],
@@ -51,7 +96,11 @@ def main():
     llm = LLMClient(**config.llm.as_kwargs())
     retriever = merge_retrievals(
         HeuristicRetriever(limit=config.retrieval.limit) if config.retrieval.enable_heuristic else None,
-        EmbeddingRetriever(model_name=config.retrieval.embedding_model or "shibing624/text2vec-base-chinese", limit=config.retrieval.limit)
+        EmbeddingRetriever(
+            model_name=config.retrieval.embedding_model or "shibing624/text2vec-base-chinese",
+            limit=config.retrieval.limit,
+            onnx_path=config.retrieval.embedding_onnx_path,
+        )
         if config.retrieval.enable_embedding
         else None,
     )
@@ -60,6 +60,7 @@ class RetrievalConfig:
     enable_heuristic: bool = True
     enable_embedding: bool = False
     embedding_model: Optional[str] = None
+    embedding_onnx_path: Optional[str] = None
     limit: int = 6
 
 
@@ -110,6 +111,7 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
         enable_heuristic=retrieval_data.get("enable_heuristic", True),
         enable_embedding=retrieval_data.get("enable_embedding", False),
         embedding_model=retrieval_data.get("embedding_model"),
+        embedding_onnx_path=retrieval_data.get("embedding_onnx_path"),
         limit=retrieval_data.get("limit", 6),
     )
     if not llm_config.api_key or llm_config.api_key == "dummy":
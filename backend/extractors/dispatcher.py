@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import os
+import time
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from .docx_extractor import extract_text_from_docx
 from .ocr_extractor import ocr_image_or_pdf
@@ -12,25 +13,75 @@ from .pdf_extractor import extract_text_from_pdf
 from .txt_extractor import extract_text_from_txt
 
 
-def extract_text_from_file(path: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
-    """Return extracted text and metadata about the extraction."""
+def extract_text_from_file(
+    path: str, filename: Optional[str] = None, content_type: Optional[str] = None, max_seconds: Optional[float] = None
+) -> Tuple[str, Dict[str, str]]:
+    """Return extracted text and metadata about the extraction.
 
+    With ``max_seconds``, PDF extraction stops after the page that crosses the
+    limit and keeps the text read so far (``metadata["deadline_exceeded"]``).
+    """
+
+    return _extract(path, path, filename, content_type, max_seconds)
+
+
+def extract_text_from_mmap(
+    mm: Any,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    path: Optional[str] = None,
+    max_seconds: Optional[float] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """Like :func:`extract_text_from_file`, reading from a read-only ``mmap`` of the file.
+
+    Extractors read through the page cache instead of a full copy in a ``bytes`` object;
+    ``path`` is still needed for the OCR fallback, which works on files.
+    """
+
+    return _extract(_MappedFile(mm), path or "", filename, content_type, max_seconds)
+
+
+class _MappedFile:
+    """File-like view of an ``mmap`` for readers that also probe ``seekable()`` (zipfile)."""
+
+    def __init__(self, mapping: Any) -> None:
+        self.mapping = mapping
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.mapping, name)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+def _extract(
+    source: Any, path: str, filename: Optional[str], content_type: Optional[str], max_seconds: Optional[float] = None
+) -> Tuple[str, Dict[str, str]]:
     detected = detect_file_type(path, filename, content_type)
+    deadline = time.monotonic() + max_seconds if max_seconds is not None else None
     text = ""
     metadata: Dict[str, str] = {"detected_type": detected}
+    # text is decoded straight from the mapping's buffer
+    raw = source.mapping if isinstance(source, _MappedFile) else source
 
     if detected == "txt":
-        text = extract_text_from_txt(path)
+        text = extract_text_from_txt(raw)
     elif detected == "docx":
-        text = extract_text_from_docx(path)
+        text = extract_text_from_docx(source)
     elif detected == "pdf":
-        text = extract_text_from_pdf(path)
+        text = extract_text_from_pdf(source, deadline=deadline, path=path or None)
     else:
         # Fallback: best-effort text read
-        text = extract_text_from_txt(path)
+        text = extract_text_from_txt(raw)
         metadata["fallback"] = "txt"
 
-    if not text.strip():
+    if deadline is not None and time.monotonic() > deadline:
+        metadata["deadline_exceeded"] = True
+    elif not text.strip() and path:
+        # OCR is slower still, so it only runs while there is time left
         if detected == "pdf" or _looks_like_image(filename, path):
             ocr_text = ocr_image_or_pdf(path)
             if ocr_text.strip():
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List
+from typing import BinaryIO, List, Union
 from xml.etree import ElementTree
 from zipfile import ZipFile
 
@@ -10,12 +10,14 @@ except Exception:  # pragma: no cover - optional dependency
     docx = None
 
 
-def extract_text_from_docx(path: str) -> str:
-    """Extract text from a .docx file using python-docx when available."""
+def extract_text_from_docx(source: Union[str, BinaryIO]) -> str:
+    """Extract text from a .docx path or seekable binary file using python-docx when available."""
 
     if docx is not None:
         try:
-            document = docx.Document(path)
+            if not isinstance(source, str):
+                source.seek(0)
+            document = docx.Document(source)
             parts: List[str] = []
             parts.extend(p.text.strip() for p in document.paragraphs if p.text and p.text.strip())
             for table in getattr(document, "tables", []):
@@ -29,7 +31,9 @@ def extract_text_from_docx(path: str) -> str:
 
     # Fallback: parse XML
     try:
-        with ZipFile(path) as zf:
+        if not isinstance(source, str):
+            source.seek(0)
+        with ZipFile(source) as zf:
             xml_bytes = zf.read("word/document.xml")
     except Exception:
         return ""
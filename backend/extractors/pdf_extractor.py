@@ -1,35 +1,255 @@
 from __future__ import annotations
 
-from typing import List
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple, Union
 
 try:
-    from pdfminer.high_level import extract_text  # type: ignore
+    import pymupdf  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
-    extract_text = None  # type: ignore
+    try:
+        import fitz as pymupdf  # type: ignore  # PyMuPDF < 1.24
+    except Exception:
+        pymupdf = None  # type: ignore
+
+try:
+    from pdfminer.converter import TextConverter  # type: ignore
+    from pdfminer.layout import LAParams  # type: ignore
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager  # type: ignore
+    from pdfminer.pdfpage import PDFPage  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    PDFPage = None  # type: ignore
+
+# below this many text characters per page a result counts as a poor extraction
+# (scans, odd font encodings) and the next extractor is tried; the longest text wins
+MIN_CHARS_PER_PAGE = 20
+
+# PyMuPDF documents with at least this many pages are split into page ranges extracted in
+# parallel; PyMuPDF reads ~1-2 ms per page, so smaller ones finish before the round-trips would
+SHARD_MIN_PAGES = 100
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+if PDFPage is not None:
+
+    def _skip0(self) -> None:
+        pass
+
+    def _skip1(self, a) -> None:
+        pass
+
+    def _skip2(self, a, b) -> None:
+        pass
 
+    def _skip4(self, a, b, c, d) -> None:
+        pass
 
-def extract_text_from_pdf(path: str) -> str:
-    """Best-effort PDF text extraction."""
+    def _skip6(self, a, b, c, d, e, f) -> None:
+        pass
 
-    if extract_text is not None:
+    class _TextOnlyInterpreter(PDFPageInterpreter):
+        """Interpreter ignoring path construction, painting, clipping and shading.
+
+        Those operators never produce text but dominate graphics-heavy pages, and each
+        painted path becomes a layout object. Skips keep the operator's arity so pdfminer
+        still pops its operands; ``cm``/``q``/``Q`` are kept since they position text.
+        """
+
+        do_m = do_l = _skip2
+        do_c = _skip6
+        do_v = do_y = do_re = _skip4
+        do_h = do_S = do_s = do_f = do_F = do_f_a = _skip0
+        do_B = do_B_a = do_b = do_b_a = do_n = do_W = do_W_a = _skip0
+        do_sh = _skip1
+
+
+def extract_text_from_pdf(
+    source: Union[str, BinaryIO], deadline: Optional[float] = None, mode: str = "simple", path: Optional[str] = None
+) -> str:
+    """Best-effort PDF text extraction from a path or a seekable binary file (e.g. an ``mmap``).
+
+    Extractors are tried fastest first: PyMuPDF, the ``pdftotext`` CLI (needs ``path``),
+    pdfminer, PyPDF2; the next one only runs when the text so far is below
+    ``MIN_CHARS_PER_PAGE``. ``deadline`` is a :func:`time.monotonic` value checked after each
+    page; once it has passed, the text of the pages read so far is returned.
+    ``mode="simple"`` interprets only the pdfminer operators that can produce text;
+    ``"full"`` runs pdfminer's stock interpreter.
+    """
+
+    if isinstance(source, str):
+        path = source
+    extractors: List[Callable[[], Tuple[str, int]]] = []
+    shared_path = _shareable_path(path) if path else None
+    if pymupdf is not None:
+        extractors.append(lambda: _pymupdf_text(source, deadline, shared_path))
+    if shared_path and shutil.which("pdftotext"):
+        extractors.append(lambda: _pdftotext_text(shared_path, deadline))
+    if PDFPage is not None:
+        extractors.append(lambda: _with_file(source, lambda f: _pdfminer_text(f, deadline, mode == "simple")))
+    extractors.append(lambda: _with_file(source, lambda f: _pypdf2_text(_pypdf2_reader(f), deadline)))
+
+    best = ""
+    for extract in extractors:
         try:
-            return extract_text(path)
+            text, pages = extract()
         except Exception:
-            pass
+            continue
+        if len(text) > len(best):
+            best = text
+        if len(best.strip()) >= pages * MIN_CHARS_PER_PAGE or (deadline is not None and time.monotonic() > deadline):
+            break
+    return best
+
+
+def _with_file(source: Union[str, BinaryIO], read: Callable[[Any], Tuple[str, int]]) -> Tuple[str, int]:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return read(f)
+    source.seek(0)
+    return read(source)
+
+
+def _shareable_path(path: str) -> str:
+    """``path`` as other processes can open it (``/proc/self`` would be their own)."""
+
+    if path.startswith("/proc/self/"):
+        return f"/proc/{os.getpid()}/{path[len('/proc/self/'):]}"
+    return path
+
 
+def _shared_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            # spawned, not forked: the API process runs threads that may hold MuPDF state
+            _page_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _page_pool
+
+
+def _pymupdf_text(
+    source: Union[str, BinaryIO], deadline: Optional[float], path: Optional[str] = None
+) -> Tuple[str, int]:
+    if path is None:
+        return _pymupdf_buffer_text(source, deadline)
+    # MuPDF reads the file itself, so the upload is never copied into a ``bytes`` object
+    with pymupdf.open(path) as doc:
+        page_count = doc.page_count
+        workers = os.cpu_count() or 1
+        if page_count < SHARD_MIN_PAGES or workers < 2:
+            text_parts = _pymupdf_pages(doc, 0, page_count, deadline)
+            return "\n".join(text_parts), len(text_parts)
     try:
-        import PyPDF2  # type: ignore
-
-        text_parts: List[str] = []
-        with open(path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                try:
-                    text = page.extract_text() or ""
-                except Exception:
-                    text = ""
-                if text:
-                    text_parts.append(text)
-        return "\n".join(text_parts)
-    except Exception:
-        return ""
+        text_parts = _pymupdf_sharded(path, page_count, workers, deadline)
+    except Exception:  # e.g. no child processes allowed inside a daemonic Celery worker
+        with pymupdf.open(path) as doc:
+            text_parts = _pymupdf_pages(doc, 0, page_count, deadline)
+    return "\n".join(text_parts), len(text_parts)
+
+
+def _pymupdf_buffer_text(source: BinaryIO, deadline: Optional[float]) -> Tuple[str, int]:
+    try:
+        # an ``mmap`` (bare or in the dispatcher's file wrapper) is read in place
+        view = memoryview(getattr(source, "mapping", source))
+    except TypeError:
+        source.seek(0)
+        view = memoryview(source.read())
+    doc = pymupdf.open(stream=view, filetype="pdf")
+    try:
+        text_parts = _pymupdf_pages(doc, 0, doc.page_count, deadline)
+    finally:
+        doc.close()
+        # MuPDF keeps the buffer exported until the document is gone; an mmap with an
+        # exported buffer cannot be closed by its owner
+        del doc
+        view.release()
+    return "\n".join(text_parts), len(text_parts)
+
+
+def _pymupdf_sharded(path: str, page_count: int, workers: int, deadline: Optional[float]) -> List[str]:
+    step = -(-page_count // workers)
+    pool = _shared_page_pool()
+    futures = [
+        pool.submit(_pymupdf_range, path, start, min(start + step, page_count), deadline)
+        for start in range(0, page_count, step)
+    ]
+    text_parts: List[str] = []
+    for future in futures:  # ranges are in page order
+        part = future.result()
+        text_parts.extend(part)
+        if len(part) < step and deadline is not None and time.monotonic() > deadline:
+            break  # this range stopped early; later ranges would leave a gap
+    return text_parts
+
+
+def _pymupdf_range(path: str, start: int, stop: int, deadline: Optional[float]) -> List[str]:
+    # runs in a page-pool worker; ``time.monotonic`` is system-wide, so the deadline carries over
+    with pymupdf.open(path) as doc:
+        return _pymupdf_pages(doc, start, stop, deadline)
+
+
+def _pymupdf_pages(doc: Any, start: int, stop: int, deadline: Optional[float]) -> List[str]:
+    text_parts: List[str] = []
+    for number in range(start, stop):
+        text_parts.append(doc[number].get_text("text"))
+        if deadline is not None and time.monotonic() > deadline:
+            break
+    return text_parts
+
+
+def _pdftotext_text(path: str, deadline: Optional[float]) -> Tuple[str, int]:
+    timeout = max(deadline - time.monotonic(), 1.0) if deadline is not None else None
+    completed = subprocess.run(
+        ["pdftotext", "-enc", "UTF-8", path, "-"], capture_output=True, timeout=timeout, check=True
+    )
+    text = completed.stdout.decode("utf-8", errors="replace")
+    return text, max(text.count("\f"), 1)  # pages end with a form feed
+
+
+def _pypdf2_reader(f: Any) -> Any:
+    import PyPDF2  # type: ignore
+
+    return PyPDF2.PdfReader(f)
+
+
+def _pdfminer_text(fp: Any, deadline: Optional[float], simple: bool) -> Tuple[str, int]:
+    # same pipeline as pdfminer.high_level.extract_text, with a page loop we control
+    output = io.StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = TextConverter(rsrcmgr, output, laparams=LAParams())
+    interpreter = (_TextOnlyInterpreter if simple else PDFPageInterpreter)(rsrcmgr, device)
+    pages = 0
+    try:
+        for page in PDFPage.get_pages(fp, caching=True):
+            interpreter.process_page(page)
+            pages += 1
+            if deadline is not None and time.monotonic() > deadline:
+                break
+    finally:
+        device.close()
+    return output.getvalue(), pages
+
+
+def _pypdf2_text(reader, deadline: Optional[float] = None) -> Tuple[str, int]:
+    text_parts: List[str] = []
+    pages = 0
+    for page in reader.pages:
+        pages += 1
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = ""
+        if text:
+            text_parts.append(text)
+        if deadline is not None and time.monotonic() > deadline:
+            break
+    return "\n".join(text_parts), pages
@@ -1,14 +1,24 @@
-from typing import Optional
+import mmap
+from typing import Optional, Union
 
 
-def extract_text_from_txt(path: str, encoding: Optional[str] = None) -> str:
+def extract_text_from_txt(source: Union[str, memoryview, bytes, mmap.mmap], encoding: Optional[str] = None) -> str:
+    """Decode a text file given by path, or a buffer such as a read-only ``mmap`` of it."""
+
     encodings = [encoding] if encoding else ["utf-8", "gbk", "gb18030", "latin1"]
+    if not isinstance(source, str):
+        for enc in encodings:
+            try:
+                # decode straight from the buffer; newlines translated as text-mode open() does
+                return str(source, enc).replace("\r\n", "\n").replace("\r", "\n")
+            except Exception:
+                continue
+        return str(source, "utf-8", errors="ignore")
     for enc in encodings:
         try:
-            with open(path, "r", encoding=enc) as f:
+            with open(source, "r", encoding=enc) as f:
                 return f.read()
         except Exception:
             continue
-    with open(path, "rb") as f:
+    with open(source, "rb") as f:
         return f.read().decode(errors="ignore")
-
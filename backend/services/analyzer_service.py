@@ -2,42 +2,156 @@
 
 from __future__ import annotations
 
+import asyncio
+import errno
+import logging
+import mmap
 import os
+import shutil
+import sys
 import tempfile
+import threading
 import time
 import uuid
-from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, Optional
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, Optional
 
+from ..analyzer.cache import ExactCache
+from ..analyzer.framework import DEFAULT_FRAMEWORK
+from ..analyzer.llm import LLMClient
 from ..analyzer.tender_llm import TenderLLMAnalyzer
+from ..config import AppConfig
 from ..storage import AnalysisJobRecord, InMemoryJobStore
-from ..extractors.dispatcher import extract_text_from_file
+from ..extractors.dispatcher import extract_text_from_file, extract_text_from_mmap
 
 
-@dataclass
+# analyzer answers that are fallbacks, not model output; never reused for a re-submission
+_FALLBACK_RESPONSES = (None, "heuristic", "timeout")
+# part of every result cache key: bump when the adaptive prompt or result schema changes
+RESULT_CACHE_VERSION = "1"
+# seconds a result persisted under ``cache_dir`` stays valid
+DEFAULT_RESULT_CACHE_TTL = 7 * 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+# ``runner(func, *args)`` arranges for ``func(*args)`` to run later, elsewhere (task group, Celery)
+AsyncRunner = Callable[..., None]
+
+# uploads are copied to disk in chunks of this size, so a large PDF is never held in memory whole
+UPLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+
+# soft limit on text extraction per upload; a pathological PDF yields the pages read so far
+EXTRACT_MAX_SECONDS = 120.0
+
+# job ids are the only thing guarding /jobs/{id}, so they stay random rather than derived
+# from pid/counters; the entropy is read from the OS in batches instead of once per job
+_ID_BATCH = 256
+_id_lock = threading.Lock()
+_id_pool = b""
+_id_offset = 0
+
+
+def _reset_id_pool() -> None:
+    global _id_pool, _id_offset
+    _id_pool, _id_offset = b"", 0
+
+
+def _new_job_id() -> str:
+    global _id_pool, _id_offset
+    with _id_lock:
+        if _id_offset >= len(_id_pool):
+            _id_pool, _id_offset = os.urandom(16 * _ID_BATCH), 0
+        raw = _id_pool[_id_offset : _id_offset + 16]
+        _id_offset += 16
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+def _intern_keys(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # keys decoded from request bodies are fresh strings per job; interned, every job's
+    # "filename"/"content_type"/... share one object and dict lookups compare by identity
+    return {sys.intern(key) if type(key) is str else key: value for key, value in metadata.items()}
+
+
+def _copy_to_fd(source: Any, out_fd: int) -> None:
+    """Copy ``source`` from its current position to ``out_fd``.
+
+    File-backed sources (an upload Starlette has spilled to disk) are copied in the kernel
+    with ``sendfile``; anything else (``BytesIO``, a still in-memory spooled file) in chunks.
+    """
+
+    in_fd = _disk_fileno(source)
+    if in_fd is not None:
+        offset = source.tell()
+        try:
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, UPLOAD_CHUNK_SIZE)
+                if not sent:
+                    break
+                offset += sent
+        except OSError as exc:
+            if exc.errno not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                raise
+        # leave the source where a plain read would; a copy cut short carries on from here
+        source.seek(offset)
+    with open(out_fd, "wb", buffering=0, closefd=False) as out:
+        shutil.copyfileobj(source, out, length=UPLOAD_CHUNK_SIZE)
+
+
+def _disk_fileno(source: Any) -> Optional[int]:
+    if getattr(source, "_rolled", True) is False:
+        return None  # SpooledTemporaryFile still in memory; fileno() would first write it out
+    try:
+        return source.fileno()
+    except (AttributeError, OSError, ValueError):  # io.UnsupportedOperation, closed files
+        return None
+
+
+def _is_cacheable_result(result: Dict[str, Any], analysis_metadata: Dict[str, Any]) -> bool:
+    # fallbacks and answers that failed to parse (empty summary and tabs) are asked again next time
+    if analysis_metadata.get("raw_response") in _FALLBACK_RESPONSES:
+        return False
+    return bool(result.get("summary") or any(tab.get("items") for tab in result.get("tabs") or []))
+
+
+if hasattr(os, "register_at_fork"):
+    # a forked worker must not hand out the ids left in its parent's batch
+    os.register_at_fork(after_in_child=_reset_id_pool)
+
+
+@dataclass(slots=True)
 class JobPayload:
-    """User-provided context for an analysis job."""
+    """User-provided context for an analysis job (``metadata`` may be ``None``; read it as ``metadata or {}``)."""
 
     text: Optional[str] = None
     filename: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
 
 
 class AnalysisService:
     """Submit and execute analysis jobs with pluggable storage."""
 
-    def __init__(self, analyzer: TenderLLMAnalyzer, store: Optional[InMemoryJobStore] = None) -> None:
+    def __init__(
+        self,
+        analyzer: TenderLLMAnalyzer,
+        store: Optional[InMemoryJobStore] = None,
+        upload_dir: Optional[str] = None,
+        result_cache: Optional[ExactCache] = None,
+    ) -> None:
         self.analyzer = analyzer
-        self.store = store or InMemoryJobStore()
+        self.store = store if store is not None else InMemoryJobStore()  # stores define __len__
+        # uploads handed to worker processes must land on a volume they can read
+        self.upload_dir = upload_dir
+        # results keyed by a digest of the text, so re-submitting a document skips the analyzer
+        self.result_cache = result_cache if result_cache is not None else ExactCache(max_entries=64)
 
     # ------------------------------------------------------------------ API
     def create_job(self, source: str, filename: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> AnalysisJobRecord:
         job = AnalysisJobRecord(
-            job_id=str(uuid.uuid4()),
+            job_id=_new_job_id(),
             status="pending",
             source=source,
             filename=filename,
-            metadata=metadata or {},
+            metadata=_intern_keys(metadata) if metadata else {},
             created_at=time.time(),
         )
         return self.store.create(job)
@@ -46,33 +160,71 @@ class AnalysisService:
         job = self.store.get(job_id)
         if not job:
             raise KeyError(f"Job {job_id} not found")
-        metadata = metadata or {}
-        combined_metadata = dict(job.metadata)
-        combined_metadata.update(metadata)
+        # one real dict, built in a single merge: a ChainMap view would save this small copy
+        # but orjson / json (Redis) cannot encode it, and the stored record must not be mutated
+        combined_metadata = {**job.metadata, **metadata} if metadata else dict(job.metadata)
         combined_metadata.pop("preprocess", None)
-        self.store.update(
-            job_id,
-            status="processing",
-            started_at=time.time(),
-            text_length=len(text),
-            metadata=combined_metadata,
-            source_text=text,
-        )
+        update = self.store.update
+        processing = {
+            "status": "processing",
+            "started_at": time.time(),
+            "text_length": len(text),
+            "metadata": combined_metadata,
+            "source_text": text,
+        }
+        update(job_id, **processing)
         try:
-            result = self.analyzer.analyze(text)
-            combined_metadata.update(result.pop("metadata", {}))
-            self.store.update(job_id, metadata=combined_metadata)
-            self.store.update(job_id, status="completed", result=result, completed_at=time.time())
+            cache_key = self._result_cache_key(text)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                result, analysis_metadata = cached
+                combined_metadata["result_cache"] = "hit"
+            else:
+                result = self.analyzer.analyze(text)
+                analysis_metadata = result.pop("metadata", {})
+                if _is_cacheable_result(result, analysis_metadata):
+                    self.result_cache.put(cache_key, (result, analysis_metadata))
+            combined_metadata.update(analysis_metadata)
+            completed = {
+                "status": "completed",
+                "metadata": combined_metadata,
+                "result": result,
+                "completed_at": time.time(),
+            }
+            # one write per phase transition; the returned record is merged here rather than
+            # read back, which for Redis would fetch the result and source text again
+            stored = update(job_id, **completed)
         except Exception as exc:  # pragma: no cover - defensive
-            self.store.update(job_id, status="failed", error=str(exc), completed_at=time.time())
+            update(job_id, status="failed", error=str(exc), completed_at=time.time())
             raise
-        finally:
-            job = self.store.get(job_id)
-        assert job is not None
-        return job
+        if stored is None:
+            raise KeyError(f"Job {job_id} not found")
+        return replace(job, **{**processing, **completed})
+
+    def _result_cache_key(self, text: str) -> bytes:
+        # the same text analysed by another model, endpoint or prompt version is a different result
+        llm = getattr(self.analyzer, "llm", None)
+        identity = [str(getattr(llm, name, None) or "") for name in ("provider", "model", "base_url")]
+        return ExactCache.make_key([RESULT_CACHE_VERSION, *identity, text])
 
-    def process_file_upload(self, job_id: str, path: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> AnalysisJobRecord:
-        text, meta = extract_text_from_file(path, filename=filename, content_type=content_type)
+    def process_file_upload(
+        self,
+        job_id: str,
+        path: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        remove: bool = False,
+    ) -> AnalysisJobRecord:
+        """Extract and analyse the upload at ``path``; with ``remove`` the file is deleted afterwards."""
+
+        try:
+            text, meta = self._extract(path, filename, content_type)
+        finally:
+            if remove:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
         if not text.strip():
             self.store.update(job_id, status="failed", error="未能从文件中提取文本或文本为空", completed_at=time.time())
             job = self.store.get(job_id)
@@ -84,7 +236,23 @@ class AnalysisService:
         return self.process_text(job_id, text, metadata=metadata)
 
     # ---------------------------------------------------------------- Helpers
-    def submit_text(self, text: str, filename: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, async_runner: Optional[Any] = None) -> AnalysisJobRecord:
+    @staticmethod
+    def _extract(path: str, filename: Optional[str], content_type: Optional[str]):
+        """Extract through a read-only mapping of the upload (empty files cannot be mapped)."""
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return extract_text_from_file(
+                    path, filename=filename, content_type=content_type, max_seconds=EXTRACT_MAX_SECONDS
+                )
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return extract_text_from_mmap(
+                    mm, filename=filename, content_type=content_type, path=path, max_seconds=EXTRACT_MAX_SECONDS
+                )
+
+    def submit_text(self, text: str, filename: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, async_runner: Optional[AsyncRunner] = None) -> AnalysisJobRecord:
         job = self.create_job(source="text", filename=filename, metadata=metadata)
         if async_runner:
             async_runner(self.process_text, job.job_id, text, metadata)
@@ -93,23 +261,66 @@ class AnalysisService:
             return stored
         return self.process_text(job.job_id, text, metadata)
 
-    def submit_file(self, file_obj, filename: Optional[str] = None, content_type: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, async_runner: Optional[Any] = None) -> AnalysisJobRecord:
+    def submit_file(self, file_obj, filename: Optional[str] = None, content_type: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, async_runner: Optional[AsyncRunner] = None) -> AnalysisJobRecord:
         job = self.create_job(source="file", filename=filename, metadata=metadata)
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(file_obj.read())
-            tmp_path = tmp.name
+        source = getattr(file_obj, "file", file_obj)  # Starlette UploadFile -> its spooled file
+        fd = self._open_anonymous()
+        if fd is None:
+            with tempfile.NamedTemporaryFile(delete=False, dir=self.upload_dir) as tmp:
+                _copy_to_fd(source, tmp.fileno())
+                tmp_path = tmp.name
+            if async_runner:
+                return self._defer_upload(async_runner, job.job_id, tmp_path, filename, content_type)
+            return self.process_file_upload(job.job_id, tmp_path, filename, content_type, remove=True)
         try:
+            _copy_to_fd(source, fd)
+            fd_path = f"/proc/self/fd/{fd}"
             if async_runner:
-                async_runner(self.process_file_upload, job.job_id, tmp_path, filename, content_type)
-                stored = self.store.get(job.job_id)
-                assert stored is not None
-                return stored
-            return self.process_file_upload(job.job_id, tmp_path, filename, content_type)
+                spool_path = self._materialize(fd, fd_path, job.job_id)
+                return self._defer_upload(async_runner, job.job_id, spool_path, filename, content_type)
+            # the inode has no name, so it vanishes with the fd and there is nothing to unlink
+            return self.process_file_upload(job.job_id, fd_path, filename, content_type)
         finally:
-            try:
-                os.unlink(tmp_path)
-            except FileNotFoundError:
-                pass
+            os.close(fd)
+
+    def _defer_upload(self, async_runner: AsyncRunner, job_id: str, path: str, filename: Optional[str], content_type: Optional[str]) -> AnalysisJobRecord:
+        # the deferred job owns the file now; deleting it here would race the runner
+        async_runner(self.process_file_upload, job_id, path, filename, content_type, True)
+        stored = self.store.get(job_id)
+        assert stored is not None
+        return stored
+
+    def _open_anonymous(self) -> Optional[int]:
+        """Open an unnamed ``O_TMPFILE`` in the upload dir, or ``None`` where unsupported."""
+
+        flag = getattr(os, "O_TMPFILE", None)
+        if flag is None or not os.path.isdir("/proc/self/fd"):
+            return None
+        try:
+            return os.open(self.upload_dir or tempfile.gettempdir(), flag | os.O_RDWR, 0o600)
+        except OSError:  # e.g. filesystems without O_TMPFILE support
+            return None
+
+    def _materialize(self, fd: int, fd_path: str, job_id: str) -> str:
+        """Give the fully written anonymous upload a name a (possibly remote) worker can open."""
+
+        directory = self.upload_dir or tempfile.gettempdir()
+        spool_path = os.path.join(directory, f"upload-{job_id}")
+        try:
+            os.link(fd_path, spool_path)
+            return spool_path
+        except OSError:  # linkat through /proc is refused on some kernels and sandboxes
+            pass
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with open(fd, "rb", closefd=False) as src, open(tmp_fd, "wb") as dst:
+                src.seek(0)
+                _copy_to_fd(src, dst.fileno())
+            os.replace(tmp_path, spool_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return spool_path
 
     # ---------------------------------------------------------------- Public read
     def serialize_job(self, job_id: str, include_result: bool = True) -> Dict[str, Any]:
@@ -120,7 +331,8 @@ class AnalysisService:
         return data
 
     def list_jobs(self) -> Dict[str, Any]:
-        jobs = [self._serialize_job_record(j, include_result=False) for j in sorted(self.store.list(), key=lambda x: x.created_at, reverse=True)]
+        serialize = self._serialize_job_record  # bound once, not per job
+        jobs = [serialize(j, False) for j in self.store.list_recent()]
         return {"jobs": jobs}
 
     def delete_job(self, job_id: str) -> bool:
@@ -129,7 +341,23 @@ class AnalysisService:
     # ---------------------------------------------------------------- Internal
     @staticmethod
     def _serialize_job_record(job: AnalysisJobRecord, include_result: bool = True) -> Dict[str, Any]:
-        payload = {
+        # read outside the store lock: the version is taken before the fields, so a summary
+        # racing an update is tagged with the old version and rebuilt on the next read
+        version = job._version
+        cached = job._cached_payload
+        if cached is not None and cached[0] == version:
+            summary = cached[1]
+        else:
+            summary = AnalysisService._job_summary(job)
+            job._cached_payload = (version, summary)
+        payload = dict(summary)
+        if include_result and job.result is not None:
+            payload["result"] = job.result
+        return payload
+
+    @staticmethod
+    def _job_summary(job: AnalysisJobRecord) -> Dict[str, Any]:
+        return {
             "job_id": job.job_id,
             "status": job.status,
             "source": job.source,
@@ -140,11 +368,9 @@ class AnalysisService:
             "completed_at": job.completed_at,
             "metadata": job.metadata,
             "error": job.error,
-            "has_source_text": bool(job.source_text),
+            # store listings (Redis) leave source_text out; text_length is written along with it
+            "has_source_text": bool(job.source_text) or job.text_length > 0,
         }
-        if include_result and job.result is not None:
-            payload["result"] = job.result
-        return payload
 
     def get_source_snippet(self, job_id: str, start: int, end: Optional[int] = None, window: int = 120) -> Dict[str, Any]:
         job = self.store.get(job_id)
@@ -176,6 +402,36 @@ class AnalysisService:
         }
 
 
+def build_service(config: AppConfig, store: Optional[InMemoryJobStore] = None, upload_dir: Optional[str] = None) -> AnalysisService:
+    llm = LLMClient(**config.llm.as_kwargs())
+    analyzer = TenderLLMAnalyzer(llm, categories=DEFAULT_FRAMEWORK)
+    # with llm.options.cache_dir set, results are shared on disk between workers like LLM answers
+    cache_dir = config.llm.options.get("cache_dir")
+    result_cache = ExactCache(
+        max_entries=64,
+        directory=os.path.join(cache_dir, "results") if cache_dir else None,
+        ttl=config.llm.options.get("result_cache_ttl", DEFAULT_RESULT_CACHE_TTL),
+    )
+    return AnalysisService(analyzer, store=store, upload_dir=upload_dir, result_cache=result_cache)
+
+
+def task_group_runner(task_group: asyncio.TaskGroup) -> AsyncRunner:
+    """``async_runner`` starting each job as a task of ``task_group``, run in a worker thread."""
+
+    def run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        task_group.create_task(_run_job(func, *args, **kwargs))
+
+    return run
+
+
+async def _run_job(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    try:
+        await asyncio.to_thread(func, *args, **kwargs)
+    except Exception:
+        # the job is already marked failed; letting this propagate would cancel the whole group
+        logger.exception("Background job failed")
+
+
 def background_runner(background_tasks, func, *args, **kwargs):
     """Helper that forwards execution to FastAPI BackgroundTasks if provided."""
 
@@ -0,0 +1,82 @@
+"""Celery tasks running analysis jobs in worker processes instead of the API process.
+
+Enabled by setting ``BIDDING_ASSISTANT_BROKER_URL`` (e.g. ``redis://localhost:6379/0``)
+with ``celery`` and ``redis`` installed. Jobs are shared through a :class:`RedisJobStore`
+at ``BIDDING_ASSISTANT_REDIS_URL`` (defaults to the broker URL). Start workers with::
+
+    celery -A backend.services.tasks worker --concurrency=$(nproc)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from celery import Celery  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    Celery = None  # type: ignore
+
+from ..config import load_config
+from ..storage import BatchedJobStore, RedisJobStore
+from .analyzer_service import AnalysisService, build_service
+
+BROKER_URL = os.getenv("BIDDING_ASSISTANT_BROKER_URL")
+REDIS_URL = os.getenv("BIDDING_ASSISTANT_REDIS_URL") or BROKER_URL
+# must be a volume shared by the API and the workers
+UPLOAD_DIR = os.getenv("BIDDING_ASSISTANT_UPLOAD_DIR")
+
+celery_app = Celery("analyzer", broker=BROKER_URL) if Celery is not None and BROKER_URL else None
+
+_service: Optional[AnalysisService] = None
+_service_lock = threading.Lock()
+
+
+def job_store() -> RedisJobStore:
+    if not REDIS_URL:
+        raise RuntimeError("BIDDING_ASSISTANT_BROKER_URL / BIDDING_ASSISTANT_REDIS_URL 未配置")
+    return RedisJobStore.from_url(REDIS_URL)
+
+
+def worker_service() -> AnalysisService:
+    """Service used inside a worker, built once per process from the app config."""
+
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                # status updates are coalesced per job; terminal ones are written at once
+                _service = build_service(load_config(), store=BatchedJobStore(job_store()), upload_dir=UPLOAD_DIR)
+    return _service
+
+
+def process_text(job_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    worker_service().process_text(job_id, text, metadata)
+
+
+def process_file_upload(
+    job_id: str,
+    path: str,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    remove: bool = False,
+) -> None:
+    worker_service().process_file_upload(job_id, path, filename, content_type, remove)
+
+
+TASKS: Dict[str, Any] = {}
+if celery_app is not None:
+    TASKS = {
+        "process_text": celery_app.task(name="analyzer.process_text")(process_text),
+        "process_file_upload": celery_app.task(name="analyzer.process_file_upload")(process_file_upload),
+    }
+
+
+def celery_runner(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """``async_runner`` for :class:`AnalysisService` enqueuing the matching Celery task."""
+
+    task = TASKS.get(getattr(func, "__name__", ""))
+    if task is None:
+        raise RuntimeError(f"No Celery task registered for {func!r}")
+    task.delay(*args, **kwargs)
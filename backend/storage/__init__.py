@@ -1,6 +1,8 @@
 """Storage backends for analysis jobs."""
 
+from .batched import BatchedJobStore
 from .memory import InMemoryJobStore, AnalysisJobRecord
+from .redis_store import RedisJobStore
 
-__all__ = ["InMemoryJobStore", "AnalysisJobRecord"]
+__all__ = ["InMemoryJobStore", "AnalysisJobRecord", "RedisJobStore", "BatchedJobStore"]
 
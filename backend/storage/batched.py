@@ -0,0 +1,141 @@
+"""Write-behind wrapper coalescing job updates for stores with a round-trip per write."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from .memory import AnalysisJobRecord
+
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedJobStore:
+    """Buffer ``update`` calls per job and write them with one ``bulk_update`` every ``interval``.
+
+    Updates that move a job to a terminal status are written at once, together with
+    anything still pending for that job. Reads through this wrapper see pending fields.
+    """
+
+    def __init__(self, store: Any, interval: float = 0.05) -> None:
+        self.store = store
+        self.interval = interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # last record seen per job with buffered writes, so ``update`` needs no read
+        self._records: Dict[str, AnalysisJobRecord] = {}
+        self._lock = threading.Lock()
+        # orders batch writes against terminal writes, so a late batch never overwrites "completed"
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # Basic CRUD -----------------------------------------------------------
+    def create(self, job: AnalysisJobRecord) -> AnalysisJobRecord:
+        return self.store.create(job)
+
+    def get(self, job_id: str) -> Optional[AnalysisJobRecord]:
+        job = self.store.get(job_id)
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if job is None or not pending:
+                return job
+            return replace(job, **pending)
+
+    def update(self, job_id: str, **fields: Any) -> Optional[AnalysisJobRecord]:
+        if fields.get("status") in TERMINAL_STATUSES:
+            with self._write_lock:
+                with self._lock:
+                    merged = {**self._pending.pop(job_id, {}), **fields}
+                    self._records.pop(job_id, None)
+                return self.store.update(job_id, **merged)
+        with self._lock:
+            record = self._records.get(job_id)
+        if record is None:
+            record = self.store.get(job_id)
+            if record is None:
+                return None
+        with self._lock:
+            pending = self._pending.setdefault(job_id, {})
+            pending.update(fields)
+            record = self._records[job_id] = replace(record, **fields)
+            self._ensure_flusher()
+        self._wake.set()
+        return record
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            self._pending.pop(job_id, None)
+            self._records.pop(job_id, None)
+        return self.store.delete(job_id)
+
+    def list(self) -> List[AnalysisJobRecord]:
+        self.flush()
+        return self.store.list()
+
+    def list_recent(self) -> List[AnalysisJobRecord]:
+        self.flush()
+        return self.store.list_recent()
+
+    # Flushing -------------------------------------------------------------
+    def flush(self) -> None:
+        """Write all pending updates; on failure they are kept for the next flush and the error re-raised."""
+
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                self.store.bulk_update(pending)
+            except Exception:
+                with self._lock:
+                    # fields buffered while the batch was in flight are newer and win
+                    for job_id, fields in pending.items():
+                        self._pending[job_id] = {**fields, **self._pending.get(job_id, {})}
+                raise
+            with self._lock:
+                for job_id in pending:
+                    if job_id not in self._pending:
+                        self._records.pop(job_id, None)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _ensure_flusher(self) -> None:
+        # called with the lock held
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="job-store-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            # let more updates arrive, then write them in one batch
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as exc:
+                # keep the thread alive; the batch is back in ``_pending`` and retried next round
+                logger.warning("Job store flush failed, retrying: %s", exc)
+                self._wake.set()
+
+    # Helpers --------------------------------------------------------------
+    def __len__(self) -> int:  # pragma: no cover - convenience
+        return len(self.store)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._records.clear()
+        self.store.clear()
@@ -6,12 +6,14 @@ replaced later by a persistent backend (Redis, SQL, etc.).
 
 from __future__ import annotations
 
+import bisect
+import itertools
 import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisJobRecord:
     job_id: str
     status: str
@@ -25,6 +27,11 @@ class AnalysisJobRecord:
     metadata: Dict[str, Any] = field(default_factory=dict)
     result: Optional[Dict[str, Any]] = None
     source_text: Optional[str] = None
+    # ``(version, summary)`` reused by the service while ``_version`` is unchanged; never persisted.
+    # init=False so ``dataclasses.replace`` copies start without it and never serve a stale one
+    _cached_payload: Optional[Tuple[int, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    # bumped by the store after every update, once the new field values are in place
+    _version: int = field(default=0, init=False, repr=False, compare=False)
 
 
 class InMemoryJobStore:
@@ -33,11 +40,18 @@ class InMemoryJobStore:
     def __init__(self) -> None:
         self._jobs: Dict[str, AnalysisJobRecord] = {}
         self._lock = threading.Lock()
+        # (-created_at, insertion seq, job_id), kept sorted so listings need no sort
+        self._order: List[Tuple[float, int, str]] = []
+        self._order_keys: Dict[str, Tuple[float, int, str]] = {}
+        self._seq = itertools.count()
 
     # Basic CRUD -----------------------------------------------------------
     def create(self, job: AnalysisJobRecord) -> AnalysisJobRecord:
         with self._lock:
+            if job.job_id in self._jobs:
+                self._unindex(job.job_id)
             self._jobs[job.job_id] = job
+            self._index(job)
         return job
 
     def get(self, job_id: str) -> Optional[AnalysisJobRecord]:
@@ -51,16 +65,44 @@ class InMemoryJobStore:
                 return None
             for key, value in fields.items():
                 setattr(job, key, value)
+            # last, so a summary built from half-applied fields is tagged with the old version
+            job._version += 1
+            if "created_at" in fields:
+                self._unindex(job_id)
+                self._index(job)
             return job
 
+    def bulk_update(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        for job_id, fields in updates.items():
+            self.update(job_id, **fields)
+
     def delete(self, job_id: str) -> bool:
         with self._lock:
-            return self._jobs.pop(job_id, None) is not None
+            if self._jobs.pop(job_id, None) is None:
+                return False
+            self._unindex(job_id)
+            return True
 
     def list(self) -> List[AnalysisJobRecord]:
         with self._lock:
             return list(self._jobs.values())
 
+    def list_recent(self) -> List[AnalysisJobRecord]:
+        """Jobs newest first (ties in creation order), from the maintained index."""
+
+        with self._lock:
+            return [self._jobs[job_id] for _, _, job_id in self._order]
+
+    def _index(self, job: AnalysisJobRecord) -> None:
+        key = (-job.created_at, next(self._seq), job.job_id)
+        bisect.insort(self._order, key)
+        self._order_keys[job.job_id] = key
+
+    def _unindex(self, job_id: str) -> None:
+        key = self._order_keys.pop(job_id, None)
+        if key is not None:
+            del self._order[bisect.bisect_left(self._order, key)]
+
     # Helpers --------------------------------------------------------------
     def __len__(self) -> int:  # pragma: no cover - convenience
         with self._lock:
@@ -69,3 +111,5 @@ class InMemoryJobStore:
     def clear(self) -> None:
         with self._lock:
             self._jobs.clear()
+            self._order.clear()
+            self._order_keys.clear()
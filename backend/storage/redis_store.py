@@ -0,0 +1,189 @@
+"""Redis-backed storage for analysis jobs.
+
+Used when jobs run in separate worker processes (see ``backend.services.tasks``),
+which cannot see the API process's in-memory store.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import fields
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgspec  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore
+
+try:
+    import redis  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    redis = None  # type: ignore
+
+from .memory import AnalysisJobRecord
+
+_FIELDS = tuple(f.name for f in fields(AnalysisJobRecord) if not f.name.startswith("_"))
+# what job listings read: the potentially large ``result`` and ``source_text`` stay in Redis
+_SUMMARY_FIELDS = tuple(name for name in _FIELDS if name not in ("result", "source_text"))
+
+# msgpack values are stored behind 0xC1, a byte msgpack never uses and UTF-8 (JSON) never
+# starts with, so hashes written by processes without msgspec still read back and vice versa
+_MSGPACK_TAG = b"\xc1"
+
+# applies an update only if the job still exists, in one round-trip:
+# KEYS = (job hash, index), ARGV = (job_id, created_at or "", field, value, ...)
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+if ARGV[2] ~= '' then redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1]) end
+return 1
+"""
+
+if msgspec is not None:
+    _msgpack_encode = msgspec.msgpack.Encoder().encode
+    _msgpack_decode = msgspec.msgpack.Decoder().decode
+
+
+class RedisJobStore:
+    """Job store keeping one Redis hash per job plus a sorted set by ``created_at``.
+
+    Fields are msgpack-encoded when ``msgspec`` is installed (smaller and several times faster
+    than JSON for large ``result`` payloads), JSON-encoded otherwise; both are read back.
+    """
+
+    def __init__(self, client: Any, prefix: str = "bidding_assistant:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self._index = f"{prefix}jobs"
+        self._update_script = client.register_script(_UPDATE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisJobStore":
+        if redis is None:
+            raise RuntimeError("RedisJobStore requires the redis package")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    @staticmethod
+    def _encode(values: Any) -> dict:
+        if msgspec is not None:
+            return {name: _MSGPACK_TAG + _msgpack_encode(value) for name, value in values}
+        return {name: json.dumps(value, ensure_ascii=False) for name, value in values}
+
+    @staticmethod
+    def _decode(raw: Any) -> Any:
+        if raw[:1] == _MSGPACK_TAG:
+            if msgspec is None:
+                raise RuntimeError("Job was written with msgspec; install msgspec to read it")
+            return _msgpack_decode(memoryview(raw)[1:])
+        return json.loads(raw)
+
+    # Basic CRUD -----------------------------------------------------------
+    def create(self, job: AnalysisJobRecord) -> AnalysisJobRecord:
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job.job_id), mapping=self._encode((name, getattr(job, name)) for name in _FIELDS))
+        pipe.zadd(self._index, {job.job_id: job.created_at})
+        pipe.execute()
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJobRecord]:
+        return self._from_hash(self.client.hgetall(self._key(job_id)))
+
+    def _from_hash(self, data: Dict[Any, Any]) -> Optional[AnalysisJobRecord]:
+        if not data:
+            return None
+        values = {}
+        for name, raw in data.items():
+            name = name.decode() if isinstance(name, bytes) else name
+            if name in _FIELDS:
+                values[name] = self._decode(raw)
+        return AnalysisJobRecord(**values)
+
+    def update(self, job_id: str, **fields: Any) -> Optional[bool]:
+        """Write ``fields`` in one round-trip; ``True``, or ``None`` when the job does not exist.
+
+        Unlike :class:`InMemoryJobStore` the record is not read back: that would fetch and
+        decode ``result`` and ``source_text`` again. Use :meth:`get` when it is needed.
+        """
+
+        self._check_fields(fields)
+        if not fields:
+            return True if self.client.exists(self._key(job_id)) else None
+        return True if self._update_script(**self._script_call(job_id, fields)) else None
+
+    def bulk_update(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Apply several jobs' updates in one round-trip; jobs deleted meanwhile are skipped."""
+
+        if not updates:
+            return
+        for fields in updates.values():
+            self._check_fields(fields)
+        pipe = self.client.pipeline()
+        for job_id, fields in updates.items():
+            if fields:
+                self._update_script(**self._script_call(job_id, fields), client=pipe)
+        pipe.execute()
+
+    def _script_call(self, job_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        args: List[Any] = [job_id, fields.get("created_at", "")]
+        for name, value in self._encode(fields.items()).items():
+            args.extend((name, value))
+        return {"keys": [self._key(job_id), self._index], "args": args}
+
+    @staticmethod
+    def _check_fields(fields: Dict[str, Any]) -> None:
+        unknown = set(fields) - set(_FIELDS)
+        if unknown:
+            raise AttributeError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+    def delete(self, job_id: str) -> bool:
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(job_id))
+        pipe.zrem(self._index, job_id)
+        removed, _ = pipe.execute()
+        return bool(removed)
+
+    def list(self) -> List[AnalysisJobRecord]:
+        return self._load(self.client.zrange(self._index, 0, -1))
+
+    def list_recent(self) -> List[AnalysisJobRecord]:
+        """Jobs newest first, read in index order from the sorted set.
+
+        Listing records carry only the summary fields: ``result`` and ``source_text`` are
+        ``None`` (``text_length`` tells whether a text was stored). Use :meth:`get` for those.
+        """
+
+        return self._load(self.client.zrevrange(self._index, 0, -1), _SUMMARY_FIELDS)
+
+    def _load(self, job_ids: Any, names: Optional[tuple] = None) -> List[AnalysisJobRecord]:
+        # one pipelined round-trip for all jobs instead of one HGETALL each
+        keys = [self._key(job_id.decode() if isinstance(job_id, bytes) else job_id) for job_id in job_ids]
+        if not keys:
+            return []
+        pipe = self.client.pipeline()
+        for key in keys:
+            if names is None:
+                pipe.hgetall(key)
+            else:
+                pipe.hmget(key, names)
+        jobs = []
+        for row in pipe.execute():
+            if names is None:
+                job = self._from_hash(row)
+            else:
+                # a job deleted since the index read comes back as all ``None``
+                job = self._from_hash({name: raw for name, raw in zip(names, row) if raw is not None})
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+    # Helpers --------------------------------------------------------------
+    def __len__(self) -> int:  # pragma: no cover - convenience
+        return int(self.client.zcard(self._index))
+
+    def clear(self) -> None:
+        for job_id in self.client.zrange(self._index, 0, -1):
+            self.client.delete(self._key(job_id.decode() if isinstance(job_id, bytes) else job_id))
+        self.client.delete(self._index)